@@ -1,4 +1,5 @@
 import json
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, field_validator, model_validator
 from enum import IntEnum
 from typing import Optional
@@ -17,43 +18,62 @@ class ErrorBase(Exception):
         self.error_code = error_code
         self.message = message
 
-        def __str__(self):
-            return f"status_code:{self.error_code} error_code:{self.error_code} message:{self.message}"
+    def __str__(self):
+        return f"status_code:{self.status_code} error_code:{self.error_code} message:{self.message}"
 
     def to_http_exception(self) -> HTTPException:
         """Convert the error instance to a FastAPI HTTPException."""
-        logger.error(f"Http Exception Error {self.error_code}: {self.message}")
-        return HTTPException(status_code=self.status_code, detail=self.details)
+        logger.error("Http Exception Error %s: %s", self.error_code, self.message)
+        return HTTPException(status_code=self.status_code, detail=self.message)
 
     def to_websocket_close(self) -> dict:
         """Generate WebSocket close details with a code and reason."""
-        logger.error(f"Websocket Close Error {self.error_code}: {self.message}")
-        return {"code": self.error_code, "reason": self.details}
+        logger.error("Websocket Close Error %s: %s", self.error_code, self.message)
+        return {"code": self.error_code, "reason": self.message}
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorSpec:
+    """Immutable error definition. Calling it builds a fresh ErrorBase to raise."""
+
+    status_code: int
+    error_code: int
+    message: str
+
+    def __call__(self) -> ErrorBase:
+        return ErrorBase(
+            status_code=self.status_code,
+            error_code=self.error_code,
+            message=self.message,
+        )
 
 
 class Errors:
-    MISSING_USER_ID_HEADER = ErrorBase(
+    MISSING_USER_ID_HEADER = ErrorSpec(
         status_code=400, error_code=4001, message="user_id header is missing"
     )
-    SESSION_NOT_FOUND = ErrorBase(
+    SESSION_NOT_FOUND = ErrorSpec(
         status_code=404, error_code=4040, message="Session not found"
     )
-    USER_FORBIDDEN = ErrorBase(
+    USER_FORBIDDEN = ErrorSpec(
         status_code=403, error_code=4030, message="User is not authorized"
     )
-    INVALID_MESSAGE_TYPE = ErrorBase(
+    INVALID_MESSAGE_TYPE = ErrorSpec(
         status_code=400,
         error_code=4002,
         message="Invalid message type",
     )
-    SESSION_CLOSED_FOR_NEW_PARTICIPANTS = ErrorBase(
+    SESSION_CLOSED_FOR_NEW_PARTICIPANTS = ErrorSpec(
         status_code=400,
         error_code=4003,
         message="Session is closed for new participants",
     )
-    ServerError = ErrorBase(
+    ServerError = ErrorSpec(
         status_code=500, error_code=5000, message="Internal Server Error"
     )
+    QUIZ_DATA_NOT_FOUND = ErrorSpec(
+        status_code=500, error_code=5001, message="Quiz data not found in cache"
+    )
 
 
 class UserLeftException(Exception):
@@ -61,8 +81,8 @@ class UserLeftException(Exception):
         super().__init__()
         self.message = "User Left"
 
-        def __str__(self):
-            return "User Left"
+    def __str__(self):
+        return "User Left"
 
 
 class QuizEndedException(Exception):
@@ -70,5 +90,16 @@ class QuizEndedException(Exception):
         super().__init__()
         self.message = "Quiz Ended"
 
-        def __str__(self):
-            return "Quiz Ended"
+    def __str__(self):
+        return "Quiz Ended"
+
+
+class TaskExitedException(Exception):
+    """Raised when a connection task returns, so the rest of the connection's tasks stop."""
+
+    def __init__(self):
+        super().__init__()
+        self.message = "Task Exited"
+
+    def __str__(self):
+        return "Task Exited"
@@ -1,8 +1,12 @@
-import json
+import asyncio
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from dataclasses import dataclass
 from fastapi import WebSocket
 from app.cache.schemas import QuizState
 from app.cache.models import QuizData
-from app.api.errors import Errors, UserLeftException
+from app.api.errors import ErrorBase, Errors, UserLeftException
 from app.api.schemas import WsConnectionType
 from app.db.models import DbUser, DbManager
 from app.db.schemas import UserAnswer
@@ -13,7 +17,80 @@ logger = logging.getLogger(__name__)
 
 db_manager = DbManager()
 
+# Answers are written on a single background thread so the event loop never waits on the DB.
+answers_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="answers-writer")
+# Answers waiting for the writer; each write drains everything queued so far in one batch.
+pending_answers: SimpleQueue = SimpleQueue()
+
+
+def write_pending_answers() -> None:
+    """
+    Inserts all the queued answers with one statement. Scheduled once per queued answer,
+    so a run that finds the queue already drained by an earlier run does nothing.
+    """
+    user_answers = []
+    while True:
+        try:
+            user_answers.append(pending_answers.get_nowait())
+        except Empty:
+            break
+    if user_answers:
+        db_manager.quiz_participants_answers.insert_users_answers(user_answers)
+
+
+async def flush_pending_answers() -> None:
+    """
+    Waits until every answer queued so far in this process is written, so reads of the
+    answers see them. Answers queued by other server processes are not waited for.
+    """
+    await asyncio.get_running_loop().run_in_executor(
+        answers_writer, write_pending_answers
+    )
+
+
+def reads_answers(message: dict) -> bool:
+    """
+    Whether handling the message reads the answers table, i.e. it is the moderator's
+    "Go To Results" choice.
+    """
+    choice = message.get("choice")
+    return (
+        message.get("type") == "moderator-choice"
+        and isinstance(choice, dict)
+        and choice.get("option") == "Go To Results"
+    )
+
+
+def _log_answers_write_error(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Error in write_pending_answers: %s", future.exception())
+
+
+@dataclass(slots=True, frozen=True)
+class HandlerResult:
+    """The outcome of handling a single message."""
+
+    quiz_data: QuizData
+    moderator_event: Optional[str] = None
+    participant_event: Optional[str] = None
+
+
 MESSAGE_TYPES_DATA_FUNCTION_MAPPING = {}
+_get_message_handler = MESSAGE_TYPES_DATA_FUNCTION_MAPPING.get
+
+# Static menus are shared across payloads and must be treated as read-only.
+_START_QUIZ_OPTION = {"option": "Start Quiz", "option_type": "cmd"}
+_END_QUIZ_OPTION = {"option": "End Quiz", "option_type": "cmd"}
+_LEAVE_QUIZ_OPTION = {"option": "Leave Quiz", "option_type": "cmd"}
+_NEXT_QUESTION_OPTION = {"option": "Next Question", "option_type": "cmd"}
+_GO_TO_RESULTS_OPTION = {"option": "Go To Results", "option_type": "cmd"}
+
+_WAITING_MOD_MENU = (_START_QUIZ_OPTION, _END_QUIZ_OPTION)
+_LEAVE_MENU = (_LEAVE_QUIZ_OPTION,)
+_END_ONLY_MENU = (_END_QUIZ_OPTION,)
+_NEXT_END_MENU = (_NEXT_QUESTION_OPTION, _END_QUIZ_OPTION)
+_GOTO_RESULTS_END_MENU = (_GO_TO_RESULTS_OPTION, _END_QUIZ_OPTION)
+_ACTIVE_MOD_MENUS = {False: _NEXT_END_MENU, True: _GOTO_RESULTS_END_MENU}
 
 
 def register_message_handler(message_type: str):
@@ -31,7 +108,7 @@ def handle_moderators_choice(
     connection_type: WsConnectionType,
     user: DbUser,
     current_timestamp: int,
-) -> tuple[QuizData, Optional[str], Optional[str]]:
+) -> HandlerResult:
     """
     This function changes quiz state based on the moderator's choice event.
     Only moderators can change the quiz state from here.
@@ -39,7 +116,7 @@ def handle_moderators_choice(
     try:
         moderator_event, participant_event = None, None
         if connection_type != WsConnectionType.MODERATOR:
-            raise Errors.USER_FORBIDDEN
+            raise Errors.USER_FORBIDDEN()
         choice = message.get("choice")
         option_type = choice.get("option_type")
         option = choice.get("option")
@@ -52,10 +129,12 @@ def handle_moderators_choice(
                 quiz_data.next_question(current_timestamp)
             elif option == "Go To Results":
                 quiz_data.get_results()
-        return quiz_data, moderator_event, participant_event
+        return HandlerResult(quiz_data, moderator_event, participant_event)
+    except ErrorBase:
+        raise
     except Exception as e:
-        logger.error(f"Error in handle_moderator_choice: {e}")
-        raise Errors.ServerError
+        logger.error("Error in handle_moderator_choice: %s", e)
+        raise Errors.ServerError()
 
 
 @register_message_handler("participant-choice")
@@ -65,7 +144,7 @@ def handle_participent_choice(
     connection_type: WsConnectionType,
     user: DbUser,
     current_timestamp: int,
-) -> tuple[QuizData, Optional[str], Optional[str]]:
+) -> HandlerResult:
     """
     This function changes quiz state based on a participant's choice event.
     Only participant can change the quiz state from here.
@@ -74,7 +153,7 @@ def handle_participent_choice(
         moderator_event, participant_event = None, None
 
         if connection_type != WsConnectionType.PARTICIPANT:
-            raise Errors.USER_FORBIDDEN
+            raise Errors.USER_FORBIDDEN()
         choice = message.get("choice")
         option_type = choice.get("option_type")
         option = choice.get("option")
@@ -82,27 +161,33 @@ def handle_participent_choice(
             if option == "Leave Quiz":
                 raise UserLeftException
         if option_type == "answer":
+            question_id = choice.get("question-id")
+            answer_id = choice.get("answer-id")
+            if not isinstance(question_id, str) or not isinstance(answer_id, str):
+                raise Errors.INVALID_MESSAGE_TYPE()
             correct_answer = answer_is_correct(choice, quiz_data)
-            db_manager.quiz_participants_answers.insert_users_answer(
-                UserAnswer(
-                    user_id=user.user_id,
-                    question_id=choice.get("question-id"),
-                    answer_id=choice.get("answer-id"),
-                    timestamp=current_timestamp,
-                    session_id=quiz_data.session_id,
-                    quiz_id=quiz_data.quiz_id,
-                    points=quiz_data.current_question.points,
-                    is_correct=correct_answer,
-                )
+            user_answer = UserAnswer(
+                user_id=user.user_id,
+                question_id=question_id,
+                answer_id=answer_id,
+                timestamp=current_timestamp,
+                session_id=quiz_data.session_id,
+                quiz_id=quiz_data.quiz_id,
+                points=quiz_data.current_question.points,
+                is_correct=correct_answer,
             )
+            pending_answers.put(user_answer)
+            asyncio.get_running_loop().run_in_executor(
+                answers_writer, write_pending_answers
+            ).add_done_callback(_log_answers_write_error)
             moderator_event = f"Participant {user.user_id} answered question"
-        return quiz_data, moderator_event, participant_event
+        return HandlerResult(quiz_data, moderator_event, participant_event)
 
-    except UserLeftException:
-        raise UserLeftException
+    except (ErrorBase, UserLeftException):
+        raise
     except Exception as e:
-        logger.error(f"Error in handle_moderator_choice: {e}")
-        raise Errors.ServerError
+        logger.error("Error in handle_participent_choice: %s", e)
+        raise Errors.ServerError()
 
 
 def handle_message(
@@ -111,124 +196,155 @@ def handle_message(
     connecrion_type: WsConnectionType,
     user: DbUser,
     current_timestamp: int,
-) -> tuple[QuizData, Optional[str], Optional[str]]:
+) -> HandlerResult:
     """
     This function manages the message handling process.
     Quiz data is updated based on the message type.
     Messages are sent from the WebSocket client to the server or from the server (in case of a question timeout) to the server.
+    Handler errors are propagated as-is and logged at the WebSocket boundary.
     """
-    try:
-        message_type = message.get("type")
-        if message_type not in MESSAGE_TYPES_DATA_FUNCTION_MAPPING:
-            raise Errors.INVALID_MESSAGE_TYPE
+    handler = _get_message_handler(message.get("type"))
+    if handler is None:
+        raise Errors.INVALID_MESSAGE_TYPE()
+
+    return handler(message, quiz_data, connecrion_type, user, current_timestamp)
 
-        (updated_quiz_data, moderator_event, participant_event) = (
-            MESSAGE_TYPES_DATA_FUNCTION_MAPPING[message_type](
-                message, quiz_data, connecrion_type, user, current_timestamp
-            )
-        )
-        return updated_quiz_data, moderator_event, participant_event
-    except Exception as e:
-        logger.error(f"Error in handle_message: {e}")
-        raise Errors.ServerError
+
+PAYLOAD_BUILDERS_MAPPING = {}
+_get_payload_builder = PAYLOAD_BUILDERS_MAPPING.get
+
+
+def register_payload_builder(quiz_state: QuizState):
+    def add_to_mapping_dict(func):
+        PAYLOAD_BUILDERS_MAPPING[quiz_state] = func
+        return func
+
+    return add_to_mapping_dict
 
 
 def get_payload(
-    quiz_data: QuizData, moderator_event: str = None, participant_event: str = None
+    quiz_data: QuizData,
+    moderator_event: str = None,
+    participant_event: str = None,
+    timestamp: Optional[int] = None,
 ) -> Union[dict, None]:
     """
     Gets the payload to be sent to the moderator client and the payload to be published to all participants.
+    The client quiz state and the timestamp are set here once, so every subscriber of a broadcast reuses them as-is.
     """
     try:
-        if quiz_data.quiz_state == QuizState.WAITING_TO_START:
-            return {
-                "moderator_display_text": f"Quiz is waiting to start.",
-                "participant_display_text": f"Quiz is waiting to start.",
-                "moderator_menu": [
-                    {"option": "Start Quiz", "option_type": "cmd"},
-                    {"option": "End Quiz", "option_type": "cmd"},
-                ],
-                "participant_menu": [{"option": "Leave Quiz", "option_type": "cmd"}],
-                "moderator_event": moderator_event,
-                "participant_event": participant_event,
-                "quiz_data": quiz_data.model_dump_json(),
-                "type": "update",
-            }
-
-        if quiz_data.quiz_state == QuizState.ACTIVE:
-            last_question = quiz_data.current_question_number == len(
-                quiz_data.questions
-            )
-            moderators_menu = get_active_mod_menu(last_question)
-
-            options = [
-                {
-                    "option": a.answer,
-                    "option_type": "answer",
-                    "answer-id": a.answer_id,
-                    "quiz-id": a.quiz_id,
-                    "question-id": a.question_id,
-                }
-                for a in quiz_data.current_question.answers.answers
-            ]
-            display = f"Quiz is active.\nQuestion {quiz_data.current_question_number}\nQuestion: {quiz_data.current_question.question}"
-
-            return {
-                "moderator_display_text": display,
-                "participant_display_text": display,
-                "participant_menu": options
-                + [{"option": "Leave Quiz", "option_type": "cmd"}],
-                "moderator_menu": moderators_menu,
-                "moderator_event": moderator_event,
-                "participant_event": participant_event,
-                "quiz_data": quiz_data.model_dump_json(),
-                "type": "update",
-            }
-
-        if quiz_data.quiz_state == QuizState.QUESTION_TIMEDOUT:
-            last_question = quiz_data.current_question_number == len(
-                quiz_data.questions
-            )
-
-            moderators_menu = get_active_mod_menu(last_question)
-
-            return {
-                "moderator_display_text": f"Question timed out.",
-                "participant_display_text": f"Question timed out.",
-                "participant_menu": [{"option": "Leave Quiz", "option_type": "cmd"}],
-                "moderator_menu": moderators_menu,
-                "moderator_event": moderator_event,
-                "participant_event": participant_event,
-                "quiz_data": quiz_data.model_dump_json(),
-                "type": "update",
-            }
-        if quiz_data.quiz_state == QuizState.ENDED:
-            return {
-                "moderator_display_text": f"Quiz Ended.",
-                "participant_display_text": f"Quiz Ended.",
-                "participant_menu": [{"option": "Leave Quiz", "option_type": "cmd"}],
-                "moderator_menu": [{"option": "End Quiz", "option_type": "cmd"}],
-                "moderator_event": moderator_event,
-                "participant_event": participant_event,
-                "quiz_data": quiz_data.model_dump_json(),
-                "type": "end",
-            }
-            raise
-        if quiz_data.quiz_state == QuizState.SHOW_RESULTS:
-            res_string = f"Quiz is over\n Results:\n{quiz_data.pretty_print_results()}"
-            return {
-                "moderator_display_text": res_string,
-                "participant_display_text": res_string,
-                "participant_menu": [{"option": "Leave Quiz", "option_type": "cmd"}],
-                "moderator_menu": [{"option": "End Quiz", "option_type": "cmd"}],
-                "moderator_event": moderator_event,
-                "participant_event": participant_event,
-                "quiz_data": quiz_data.model_dump_json(),
-                "type": "update",
-            }
+        builder = _get_payload_builder(quiz_data.quiz_state)
+        if builder is None:
+            return None
+        payload = builder(quiz_data, moderator_event, participant_event)
+        if timestamp is not None:
+            payload["timestamp"] = timestamp
+        return payload
     except Exception as e:
-        logger.error(f"Error in get_payload: {e}")
-        raise Errors.ServerError.to_websocket_close()
+        logger.error("Error in get_payload: %s", e)
+        raise Errors.ServerError()
+
+
+@register_payload_builder(QuizState.WAITING_TO_START)
+def build_waiting_payload(
+    quiz_data: QuizData,
+    moderator_event: Optional[str],
+    participant_event: Optional[str],
+) -> dict:
+    return {
+        "moderator_display_text": f"Quiz is waiting to start.",
+        "participant_display_text": f"Quiz is waiting to start.",
+        "moderator_menu": _WAITING_MOD_MENU,
+        "participant_menu": _LEAVE_MENU,
+        "moderator_event": moderator_event,
+        "participant_event": participant_event,
+        "quiz_data": orjson.Fragment(quiz_data.json_bytes_cached()),
+        "quiz-state": quiz_data.client_json_cached(),
+        "type": "update",
+    }
+
+
+@register_payload_builder(QuizState.ACTIVE)
+def build_active_payload(
+    quiz_data: QuizData,
+    moderator_event: Optional[str],
+    participant_event: Optional[str],
+) -> dict:
+    moderators_menu = get_active_mod_menu(quiz_data.is_last_question)
+
+    options = quiz_data.current_question.participant_options
+    display = f"Quiz is active.\nQuestion {quiz_data.current_question_number}\nQuestion: {quiz_data.current_question.question}"
+
+    return {
+        "moderator_display_text": display,
+        "participant_display_text": display,
+        "participant_menu": options + [_LEAVE_QUIZ_OPTION],
+        "moderator_menu": moderators_menu,
+        "moderator_event": moderator_event,
+        "participant_event": participant_event,
+        "quiz_data": orjson.Fragment(quiz_data.json_bytes_cached()),
+        "quiz-state": quiz_data.client_json_cached(),
+        "type": "update",
+    }
+
+
+@register_payload_builder(QuizState.QUESTION_TIMEDOUT)
+def build_timedout_payload(
+    quiz_data: QuizData,
+    moderator_event: Optional[str],
+    participant_event: Optional[str],
+) -> dict:
+    moderators_menu = get_active_mod_menu(quiz_data.is_last_question)
+
+    return {
+        "moderator_display_text": f"Question timed out.",
+        "participant_display_text": f"Question timed out.",
+        "participant_menu": _LEAVE_MENU,
+        "moderator_menu": moderators_menu,
+        "moderator_event": moderator_event,
+        "participant_event": participant_event,
+        "quiz_data": orjson.Fragment(quiz_data.json_bytes_cached()),
+        "quiz-state": quiz_data.client_json_cached(),
+        "type": "update",
+    }
+
+
+@register_payload_builder(QuizState.ENDED)
+def build_ended_payload(
+    quiz_data: QuizData,
+    moderator_event: Optional[str],
+    participant_event: Optional[str],
+) -> dict:
+    return {
+        "moderator_display_text": f"Quiz Ended.",
+        "participant_display_text": f"Quiz Ended.",
+        "participant_menu": _LEAVE_MENU,
+        "moderator_menu": _END_ONLY_MENU,
+        "moderator_event": moderator_event,
+        "participant_event": participant_event,
+        "quiz_data": orjson.Fragment(quiz_data.json_bytes_cached()),
+        "type": "end",
+    }
+
+
+@register_payload_builder(QuizState.SHOW_RESULTS)
+def build_results_payload(
+    quiz_data: QuizData,
+    moderator_event: Optional[str],
+    participant_event: Optional[str],
+) -> dict:
+    res_string = f"Quiz is over\n Results:\n{quiz_data.pretty_print_results()}"
+    return {
+        "moderator_display_text": res_string,
+        "participant_display_text": res_string,
+        "participant_menu": _LEAVE_MENU,
+        "moderator_menu": _END_ONLY_MENU,
+        "moderator_event": moderator_event,
+        "participant_event": participant_event,
+        "quiz_data": orjson.Fragment(quiz_data.json_bytes_cached()),
+        "quiz-state": quiz_data.client_json_cached(),
+        "type": "update",
+    }
 
 
 @register_message_handler("timeout")
@@ -238,20 +354,22 @@ def handle_timeout(
     connection_type: WsConnectionType,
     user: DbUser,
     current_timestamp: int,
-) -> QuizData:
+) -> HandlerResult:
     """
     This function changes quiz state based on a timeout event.
     """
     try:
         moderator_event, participant_event = None, None
         if connection_type != WsConnectionType.MODERATOR:
-            raise Errors.USER_FORBIDDEN
-        if quiz_data.quiz_state == QuizState.ACTIVE:
+            raise Errors.USER_FORBIDDEN()
+        if quiz_data.quiz_state is QuizState.ACTIVE:
             quiz_data.timeout_question()
-        return quiz_data, moderator_event, participant_event
+        return HandlerResult(quiz_data, moderator_event, participant_event)
+    except ErrorBase:
+        raise
     except Exception as e:
-        logger.error(f"Error in handle_timeout: {e}")
-        raise Errors.ServerError
+        logger.error("Error in handle_timeout: %s", e)
+        raise Errors.ServerError()
 
 
 def answer_is_correct(selected_choice, quiz_data) -> bool:
@@ -259,35 +377,16 @@ def answer_is_correct(selected_choice, quiz_data) -> bool:
     if quiz_data.quiz_id != selected_choice.get("quiz-id"):
         return False
 
-    quiz_data_question = [
-        q
-        for q in quiz_data.questions
-        if q.question_id == selected_choice.get("question-id")
-    ][0]
-
-    for a in quiz_data_question.answers.answers:
-        if a.answer_id == selected_choice.get("answer-id"):
-            return a.correct_answer
-    return False
-
-
-def get_active_mod_menu(last_question: bool) -> list[dict]:
-    if last_question:
-        return [
-            {"option": "Go To Results", "option_type": "cmd"},
-            {"option": "End Quiz", "option_type": "cmd"},
-        ]
-    else:
-        return [
-            {"option": "Next Question", "option_type": "cmd"},
-            {"option": "End Quiz", "option_type": "cmd"},
-        ]
-
-
-class UserLeftException(Exception):
-    def __init__(self):
-        super().__init__()
-        self.message = "User Left"
-
-        def __str__(self):
-            return "User Left"
+    question = quiz_data.questions_by_id.get(selected_choice.get("question-id"))
+    if question is None:
+        return False
+
+    answer = question.answers.answers_by_id.get(selected_choice.get("answer-id"))
+    return answer is not None and answer.correct_answer
+
+
+def get_active_mod_menu(last_question: bool) -> tuple[dict, ...]:
+    """
+    Returns one of the two precomputed moderator menus; the result is shared and read-only.
+    """
+    return _ACTIVE_MOD_MENUS[last_question]
@@ -2,8 +2,11 @@ import asyncio
 from datetime import datetime
 import os
 from fastapi import FastAPI, WebSocket
+from fastapi.responses import ORJSONResponse
+from fastapi.websockets import WebSocketState
 import logging
-from app.api.errors import UserLeftException
+from app.api.errors import TaskExitedException, UserLeftException
+from app.api.handlers import answers_writer
 from app.api.models import (
     NewQuizRequest,
     NewSessionRequest,
@@ -24,14 +27,24 @@ from app.db.schemas import (
     UserRole,
 )
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+if uvloop is not None:
+    # uvicorn already selects uvloop on its own; this covers other ASGI runners.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 cache_manager = CacheManager()
 db_manager = DbManager()
 pubsub_manager = PubSubManager()
 
 WEBSOCKET_TIMEOUT = int(os.getenv("WEBSOCKET_TIMEOUT", "360"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
 )
@@ -48,12 +61,28 @@ async def lifespan(app: FastAPI):
         await pubsub_manager.start()
         yield
     finally:
-        await cache_manager.close()
-        await db_manager.close()
+        cache_manager.close()
+        await asyncio.to_thread(answers_writer.shutdown, wait=True)
+        db_manager.close()
         await pubsub_manager.close()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+async def run_connection_tasks(manager: WebSocketManager) -> None:
+    """
+    Run the connection's tasks until the first one returns or fails, or the connection times out.
+    The task group cancels the remaining tasks on the way out.
+    """
+    try:
+        async with asyncio.timeout(WEBSOCKET_TIMEOUT):
+            async with asyncio.TaskGroup() as task_group:
+                manager.manage_tasks(task_group)
+    except* (QuizEndedException, UserLeftException, TaskExitedException):
+        pass
+    except* TimeoutError:
+        logger.info("Connection timed out for session %s", manager.session_id)
 
 
 @app.websocket("/{session_id}")
@@ -72,7 +101,7 @@ async def main_ws(websocket: WebSocket, session_id: str):
 
     await websocket.accept()
 
-    logger.info(f"Moderator connected to session {session_id}")
+    logger.info("Moderator connected to session %s", session_id)
 
     if not await manager.validate_connection_and_initialize_cache():
         return
@@ -81,40 +110,14 @@ async def main_ws(websocket: WebSocket, session_id: str):
 
         await manager.send_initial_payload()
 
-        tasks = manager.manage_tasks()
-
-        done, pending = await asyncio.wait(
-            tasks,
-            return_when=asyncio.FIRST_COMPLETED,
-            timeout=WEBSOCKET_TIMEOUT,
-        )
-
-        for task in pending:
-            # Cancel tasks if the connection is closed
-            if websocket.client_state.value != 1:
-                logger.info(
-                    f"Closing task: {task} for session {session_id} for user {manager.user.user_id}"
-                )
-                task.cancel()
-
-        for task in done:
-            if isinstance(task.exception(), QuizEndedException) or isinstance(
-                task.exception(), UserLeftException
-            ):
-                for p in pending:
-                    p.cancel()
-                break
-            else:
-                logger.error(
-                    f"Task {task} for session {session_id} for user {manager.user.user_id} exited with exception {task.exception()}"
-                )
+        await run_connection_tasks(manager)
 
     except Exception as e:
-        logger.error(f"Error in WS Manager: {e}")
+        logger.error("Error in WS Manager: %s", e)
     finally:
-        logger.info(f"Moderator disconnected from session {session_id}")
+        logger.info("Moderator disconnected from session %s", session_id)
         # Close the connection if it's not already closed
-        if websocket.client_state.value != 2:
+        if websocket.client_state is not WebSocketState.DISCONNECTED:
             await manager.close_connection()
 
 
@@ -130,10 +133,11 @@ def signup(signup_request: SignupRequest):
             email=signup_request.email,
             create_date=datetime.now(),
         )
-        db_manager.users.add_user(user)
+        with db_manager.transaction():
+            db_manager.users.add_user(user)
         return {"user_id": user.user_id}
     except Exception as e:
-        logger.error(f"Error in signup: {e}")
+        logger.error("Error in signup: %s", e)
         return {"error": "Error in signup"}
 
 
@@ -149,7 +153,8 @@ def create_session(new_session_request: NewSessionRequest):
         room_id=DbSession.generate_room_id(),
         moderator_id=new_session_request.user_id,
     )
-    db_manager.quiz_sessions.add_session(session)
+    with db_manager.transaction():
+        db_manager.quiz_sessions.add_session(session)
     return {"session_id": session.session_id}
 
 
@@ -163,15 +168,14 @@ def create_quiz(new_quiz_request: NewQuizRequest):
         quiz_name=new_quiz_request.quiz.name,
         quiz_description=new_quiz_request.quiz.description,
     )
-    db_manager.quizzes.add_quiz(quiz)
 
     permissions = UserPermission(
         user_id=new_quiz_request.user_id,
         quiz_id=quiz.quiz_id,
         permission=UserRole.MODERATOR,
     )
-    db_manager.quiz_permissions.add_permission(permissions)
 
+    questions = []
     for i, q_ in enumerate(new_quiz_request.quiz.questions, 1):
         question_id = DbQuestion.generate_question_id()
         question = DbQuestion(
@@ -195,5 +199,10 @@ def create_quiz(new_quiz_request: NewQuizRequest):
             ),
             quiz_id=quiz.quiz_id,
         )
-        db_manager.questions.insert_question(question)
+        questions.append(question)
+
+    with db_manager.transaction():
+        db_manager.quizzes.add_quiz(quiz)
+        db_manager.quiz_permissions.add_permission(permissions)
+        db_manager.questions.insert_questions(questions)
     return {"quiz_id": quiz.quiz_id}
@@ -1,23 +1,46 @@
 import asyncio
 import os
-from typing import Any, Dict, Optional, List
-from fastapi import WebSocket
+from typing import Any, Awaitable, Dict, Optional, List, Union
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 import logging
+import orjson
 
 from pydantic import BaseModel
-from app.cache.models import CacheManager, PubSubManager, QuizData
+from app.cache.models import (
+    CacheManager,
+    ChannelMessage,
+    PubSubManager,
+    QuizData,
+)
 from app.db.models import DbManager, DbUser
 from app.cache.schemas import QuizState
 from app.api.schemas import WsConnectionType
-from app.api.errors import Errors, QuizEndedException
+from app.api.errors import Errors, QuizEndedException, TaskExitedException
 from app.api.handlers import (
+    flush_pending_answers,
     handle_message,
     get_payload,
+    reads_answers,
 )
 from app.db.schemas import DbQuiz
 
 logger = logging.getLogger(__name__)
 HEARTBEAT_INTERVAL = int(os.getenv("HEARTBEAT_INTERVAL", "3"))
+SEND_QUEUE_SIZE = int(os.getenv("SEND_QUEUE_SIZE", "256"))
+SEND_BATCH_SIZE = int(os.getenv("SEND_BATCH_SIZE", "128"))
+RECEIVE_QUEUE_SIZE = int(os.getenv("RECEIVE_QUEUE_SIZE", "256"))
+RECEIVE_BATCH_SIZE = int(os.getenv("RECEIVE_BATCH_SIZE", "32"))
+# Binary frames skip decoding the encoded JSON back to str, but clients must accept them
+WS_BINARY_FRAMES = os.getenv("WS_BINARY_FRAMES", "false") == "true"
+
+# Shared and read-only: heartbeats carry no quiz state, so nothing is fetched to build them.
+PING_PAYLOAD = {"type": "ping"}
+
+_CONNECTION_TYPES = {
+    WsConnectionType.MODERATOR.value: WsConnectionType.MODERATOR,
+    WsConnectionType.PARTICIPANT.value: WsConnectionType.PARTICIPANT,
+}
 
 
 class WebSocketManager:
@@ -36,9 +59,19 @@ class WebSocketManager:
         self.cache_manager = cache_manager
         self.db_manager = db_manager
         self.pubsub_manager = pubsub_manager
+        self.channel = pubsub_manager.get_session_channel(session_id)
         self.connection_type: Optional[WsConnectionType] = None
         self.quiz_data: Optional[QuizData] = None
         self.user = Optional[DbUser]
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self._receive_queue: asyncio.Queue = asyncio.Queue(maxsize=RECEIVE_QUEUE_SIZE)
+        # Set by the pub/sub listener; the cached quiz_data is refetched only after a broadcast.
+        self._quiz_data_dirty = asyncio.Event()
+        # Set on every pub/sub broadcast so quiz_timer wakes up on state transitions.
+        self._state_changed = asyncio.Event()
+        # Held by the moderator's batches and quiz_timer from reading the state until its
+        # update is written, so neither transitions from a state the other is replacing.
+        self._state_lock = asyncio.Lock()
 
     async def validate_connection_and_initialize_cache(self) -> bool:
         """Validate the WebSocket connection parameters."""
@@ -46,20 +79,20 @@ class WebSocketManager:
             user_id = self.websocket.headers.get("user_id")
             role = self.websocket.headers.get("role")
 
-            self.connection_type = WsConnectionType(role)
+            self.connection_type = _CONNECTION_TYPES.get(role, WsConnectionType.UNKNOWN)
 
             if user_id is None:
-                raise Errors.MISSING_USER_ID_HEADER
+                raise Errors.MISSING_USER_ID_HEADER()
 
             if self.connection_type == WsConnectionType.MODERATOR:
 
                 db_session = self.db_manager.quiz_sessions.get_session(self.session_id)
 
                 if db_session is None:
-                    raise Errors.SESSION_NOT_FOUND
+                    raise Errors.SESSION_NOT_FOUND()
 
                 if db_session.moderator_id != user_id:
-                    raise Errors.USER_FORBIDDEN
+                    raise Errors.USER_FORBIDDEN()
 
                 quiz_questions = self.db_manager.questions.get_quiz_questions(
                     db_session.quiz_id
@@ -74,10 +107,13 @@ class WebSocketManager:
                 self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
 
                 if self.quiz_data is None:
-                    raise Errors.SESSION_NOT_FOUND
+                    raise Errors.SESSION_NOT_FOUND()
 
-            if self.quiz_data.quiz_state != QuizState.WAITING_TO_START:
-                raise Errors.SESSION_CLOSED_FOR_NEW_PARTICIPANTS
+            else:
+                raise Errors.USER_FORBIDDEN()
+
+            if self.quiz_data.quiz_state is not QuizState.WAITING_TO_START:
+                raise Errors.SESSION_CLOSED_FOR_NEW_PARTICIPANTS()
 
             self.user = self.db_manager.users.get_user(user_id)
 
@@ -89,60 +125,120 @@ class WebSocketManager:
         """Listen to pub/sub messages and handle them."""
         try:
             async for message in self.pubsub_manager.listen_to_channel(self.session_id):
-                logger.debug(f"Received pub/sub message, session_id: {self.session_id}")
-
-                self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
-
-                if self.quiz_data is None:
-                    logger.error(
-                        f"Quiz data not found in cache for session: {self.session_id}"
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Received pub/sub message, session_id: %s", self.session_id
                     )
-                    return
 
-                if message:
-                    message = handle_pubsub_msg(message, self.quiz_data)
-                    await self.dispatch_to_client(message)
+                self._quiz_data_dirty.set()
+                self._state_changed.set()
+
+                frame = handle_pubsub_msg(message, self.quiz_data)
+                await self.dispatch_to_client(frame)
 
         except Exception as e:
-            logger.error(f"Error in listen_to_pubsub_channel: {e}")
+            logger.error("Error in listen_to_pubsub_channel: %s", e)
             raise e
 
+    async def receive_loop(self) -> None:
+        """
+        Read client messages into the receive queue until the connection closes.
+        """
+        try:
+            while self.websocket.client_state is WebSocketState.CONNECTED:
+                await self._receive_queue.put(await self.receive_message())
+        except Exception as e:
+            logger.info("error in receive_loop: %s", e)
+
     async def listen_to_websocket(self) -> None:
         """
         Listen to WebSocket messages and handle them.
+        Messages that arrived while the previous batch was handled are processed together,
+        with a single cache update and a single broadcast per batch.
         """
         try:
             while True:
+                messages = [await self._receive_queue.get()]
+                while len(messages) < RECEIVE_BATCH_SIZE:
+                    try:
+                        messages.append(self._receive_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
 
-                if self.websocket.client_state.value != 1:
-                    break
+                async with self._state_lock:
+                    await self.handle_batch(messages)
 
-                message = await self.websocket.receive_json()
+        except Exception as e:
+            logger.info("error in listen_to_websocket: %s", e)
 
-                self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
+    async def handle_batch(self, messages: List[dict]) -> None:
+        """
+        Handle a batch of client messages against fresh quiz data, then write and
+        broadcast the result once. If a message fails, the messages before it are still
+        written and broadcast before its error is raised.
+        """
+        if any(map(reads_answers, messages)):
+            await flush_pending_answers()
+
+        self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
+        current_timestamp = self.cache_manager.get_timestamp()
 
-                self.quiz_data, moderator_event, participant_event = handle_message(
+        moderator_events, participant_events = [], []
+        handled, error = 0, None
+        for message in messages:
+            try:
+                result = handle_message(
                     message,
                     self.quiz_data,
                     self.connection_type,
                     self.user,
-                    self.cache_manager.get_timestamp(),
+                    current_timestamp,
                 )
+            except Exception as e:
+                # The messages handled before this one are still written and broadcast
+                error = e
+                break
+            handled += 1
+            self.quiz_data = result.quiz_data
+            if result.moderator_event:
+                moderator_events.append(result.moderator_event)
+            if result.participant_event:
+                participant_events.append(result.participant_event)
+
+        if handled and self.quiz_data is not None:
+            payload = get_payload(
+                self.quiz_data,
+                "\n".join(moderator_events) or None,
+                "\n".join(participant_events) or None,
+                current_timestamp,
+            )
 
-                if self.quiz_data is not None:
-                    # Only when quiz_data is updated by moderator - send to all participants
-                    self.cache_manager.update_quiz_data(self.quiz_data)
-
-                    payload = get_payload(
-                        self.quiz_data, moderator_event, participant_event
-                    )
+            # Only the moderator changes the session state. Participants' snapshots
+            # may be stale, so their batches never write the state and are only
+            # broadcast if no transition happened in the meantime.
+            if self.connection_type == WsConnectionType.MODERATOR:
+                await self.pubsub_manager.update_quiz_data_and_publish(
+                    self.quiz_data, self.channel, payload
+                )
+            else:
+                await self.pubsub_manager.publish_if_state_unchanged(
+                    self.quiz_data, self.channel, payload
+                )
 
-                    self.pubsub_manager.add_payload_to_publish_queue(
-                        self.session_id, payload
-                    )
+        if error is not None:
+            raise error
 
-        except Exception as e:
-            logger.info(f"error in listen_to_websocket: {e}")
+    async def receive_message(self) -> dict:
+        """
+        Receive a JSON message from the client, sent as either a text or a binary frame.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message["code"], message.get("reason"))
+        data = message.get("text")
+        if data is None:
+            data = message["bytes"]
+        return orjson.loads(data)
 
     async def close_connection(self, error: Optional[Any] = None) -> None:
         """
@@ -153,51 +249,53 @@ class WebSocketManager:
         else:
             await self.websocket.close()
 
+    def current_quiz_data(self) -> QuizData:
+        """
+        Returns the cached quiz data, refetching it from the cache only if a
+        pub/sub broadcast arrived since the last read.
+        """
+        if self._quiz_data_dirty.is_set():
+            self._quiz_data_dirty.clear()
+            self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
+        return self.quiz_data
+
     async def heartbeat(self):
         """Send periodic pings to keep connection alive."""
         try:
             while True:
                 await asyncio.sleep(HEARTBEAT_INTERVAL)
-
-                self.quiz_data = self.cache_manager.get_quiz_data(self.session_id)
-
-                payload = get_payload(self.quiz_data)
-
-                await self.dispatch_to_client(payload=payload)
+                await self._send_queue.put(PING_PAYLOAD)
         except Exception as e:
-            logger.error(f"Error in heartbeat: {e}")
+            logger.error("Error in heartbeat: %s", e)
 
-    def manage_tasks(self) -> List[asyncio.Task]:
-        try:
-            tasks = []
-            tasks.append(
-                asyncio.create_task(
-                    self.listen_to_pubsub_channel(),
-                    name=f"Pubsub Task for {self.session_id}",
-                )
-            )
-            tasks.append(
-                asyncio.create_task(
-                    self.listen_to_websocket(), name=f"WS Task for {self.session_id}"
-                )
-            )
+    async def run_until_exit(self, coro: Awaitable[None]) -> None:
+        """
+        Await a connection task and raise TaskExitedException once it returns,
+        so the task group stops the connection's other tasks.
+        """
+        await coro
+        raise TaskExitedException
 
-            tasks.append(
-                asyncio.create_task(
-                    self.heartbeat(), name=f"Heartbeat Task for {self.session_id}"
-                )
-            )
+    def manage_tasks(self, task_group: asyncio.TaskGroup) -> List[asyncio.Task]:
+        try:
+            coros = {
+                f"Pubsub Task for {self.session_id}": self.listen_to_pubsub_channel(),
+                f"WS Receive Task for {self.session_id}": self.receive_loop(),
+                f"WS Task for {self.session_id}": self.listen_to_websocket(),
+                f"Heartbeat Task for {self.session_id}": self.heartbeat(),
+                f"Writer Task for {self.session_id}": self.writer_loop(),
+            }
             if self.connection_type == WsConnectionType.MODERATOR:
-                tasks.append(
-                    asyncio.create_task(
-                        self.quiz_timer(),
-                        name=f"Question Timeout Task for {self.session_id}",
-                    )
+                coros[f"Question Timeout Task for {self.session_id}"] = (
+                    self.quiz_timer()
                 )
 
-            return tasks
+            return [
+                task_group.create_task(self.run_until_exit(coro), name=name)
+                for name, coro in coros.items()
+            ]
         except Exception as e:
-            logger.error(f"Error in manage_tasks: {e}")
+            logger.error("Error in manage_tasks: %s", e)
             raise e
 
     async def send_initial_payload(self) -> None:
@@ -213,7 +311,10 @@ class WebSocketManager:
                 moderator_event = f"Participant {self.user.user_id} Joined Quiz"
 
             initial_payload = get_payload(
-                self.quiz_data, moderator_event, participant_event
+                self.quiz_data,
+                moderator_event,
+                participant_event,
+                self.cache_manager.get_timestamp(),
             )
 
             await self.dispatch_to_client(initial_payload)
@@ -223,75 +324,125 @@ class WebSocketManager:
             )
 
         except Exception as e:
-            logger.error(f"Error in send_initial_payload: {e}")
+            logger.error("Error in send_initial_payload: %s", e)
             raise e
 
     async def dispatch_to_client(
         self,
-        payload: dict,
+        payload: Union[dict, orjson.Fragment],
     ) -> None:
+        """
+        Queue a payload for the writer task. Waits only when the send queue is full.
+        Payloads are stamped once by get_payload, so they are queued unchanged.
+        Broadcasts arrive as orjson.Fragment frames and are forwarded without re-encoding.
+        """
         try:
-            if payload.get("type") == "update":
-                payload["quiz-state"] = self.quiz_data.client_model_dump_json()
-            payload["timestamp"] = self.cache_manager.get_timestamp()
-            await self.websocket.send_json(payload)
+            await self._send_queue.put(payload)
         except Exception as e:
-            logger.error(f"Error dispatching data to client: {e}")
+            logger.error("Error dispatching data to client: %s", e)
             raise e
 
+    async def writer_loop(self) -> None:
+        """
+        Send queued payloads to the client.
+        Payloads that piled up while the previous frame was being sent are coalesced
+        into a single {"type": "batch", "items": [...]} frame; a lone payload is sent as-is.
+        """
+        try:
+            while True:
+                batch = [await self._send_queue.get()]
+                while len(batch) < SEND_BATCH_SIZE:
+                    try:
+                        batch.append(self._send_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                if len(batch) == 1:
+                    frame = orjson.dumps(batch[0])
+                else:
+                    frame = orjson.dumps({"type": "batch", "items": batch})
+                if WS_BINARY_FRAMES:
+                    await self.websocket.send_bytes(frame)
+                else:
+                    # Text frames keep existing clients parsing them unchanged
+                    await self.websocket.send_text(frame.decode())
+        except Exception as e:
+            logger.error("Error in writer_loop: %s", e)
+            raise e
+
+    async def wait_for_state_change(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a pub/sub broadcast arrives or the timeout expires.
+        """
+        try:
+            await asyncio.wait_for(self._state_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
     async def quiz_timer(self) -> None:
         """
         This is for timing out questions.
+        Sleeps until the current question's deadline, or until the next state change.
         """
         try:
             while True:
-                quiz_data = self.cache_manager.get_quiz_data(self.session_id)
+                self._state_changed.clear()
+
+                quiz_data = self.current_quiz_data()
 
-                if quiz_data.quiz_state != QuizState.ACTIVE:
-                    await asyncio.sleep(1)
+                if quiz_data.quiz_state is not QuizState.ACTIVE:
+                    await self.wait_for_state_change()
                     continue
 
                 current_timestamp = self.cache_manager.get_timestamp()
 
                 end_timestamp = quiz_data.current_question_end_timestamp
 
-                if current_timestamp >= end_timestamp:
+                if current_timestamp < end_timestamp:
+                    await self.wait_for_state_change(
+                        timeout=end_timestamp - current_timestamp
+                    )
+                    continue
+
+                async with self._state_lock:
+                    quiz_data = self.current_quiz_data()
+                    if (
+                        quiz_data.quiz_state is not QuizState.ACTIVE
+                        or quiz_data.current_question_end_timestamp != end_timestamp
+                    ):
+                        # A moderator batch moved on while waiting for the lock
+                        continue
 
-                    self.quiz_data, _, _ = handle_message(
+                    self.quiz_data = handle_message(
                         {"type": "timeout"},
-                        self.quiz_data,
+                        quiz_data,
                         self.connection_type,
                         self.user,
                         current_timestamp,
-                    )
+                    ).quiz_data
 
-                    self.cache_manager.update_quiz_data(self.quiz_data)
+                    payload = get_payload(self.quiz_data, timestamp=current_timestamp)
 
-                    payload = get_payload(self.quiz_data)
-
-                    self.pubsub_manager.add_payload_to_publish_queue(
-                        self.session_id, payload
+                    await self.pubsub_manager.update_quiz_data_and_publish(
+                        self.quiz_data, self.channel, payload
                     )
 
-                await asyncio.sleep(1)
-
         except Exception as e:
-            logger.error(f"Error in question_clock: {e}")
+            logger.error("Error in question_clock: %s", e)
             raise e
 
 
-def handle_pubsub_msg(message: dict, quiz_data: QuizData) -> dict:
+def handle_pubsub_msg(message: ChannelMessage, quiz_data: QuizData) -> orjson.Fragment:
     """
-    Handle the pub/sub message and update the quiz data.
+    Handle the pub/sub message and return the frame to forward to the client.
     """
     try:
-        type = message.get("type")
-        if type == "end":
+        if message.type == "end":
             raise QuizEndedException
-        return message
+        return message.frame
     except Exception as e:
-        if e != QuizEndedException:
-            logger.error(f"Error in handle_pubsub_msg: {e}")
+        if not isinstance(e, QuizEndedException):
+            logger.error("Error in handle_pubsub_msg: %s", e)
         raise e
 
 
@@ -1,30 +1,102 @@
 import asyncio
+from collections import deque
+from dataclasses import dataclass
 import logging
-import json
+import orjson
 from app.cache.schemas import QuizState
 from app.db.schemas import DbSession, DbQuestion, UserResults
-from app.db.models import DbManager
+from app.db.models import QUIZ_QUESTIONS_CACHE_SIZE, DbManager
 from app.api.errors import Errors
-from pydantic import BaseModel, field_validator
-from typing import Optional, AsyncGenerator, Dict, List
+from pydantic import BaseModel, PrivateAttr
+from typing import Optional, AsyncGenerator, Dict, List, Tuple
+from functools import cached_property, lru_cache
 import os
+import time
 import redis
+import redis.asyncio as aioredis
 
 logger = logging.getLogger(__name__)
 
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = os.getenv("REDIS_PORT")
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+PUBLISH_BATCH_SIZE = int(os.getenv("PUBLISH_BATCH_SIZE", "100"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+CLOCK_SYNC_INTERVAL = int(os.getenv("CLOCK_SYNC_INTERVAL", "60"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
 
 db_manager = DbManager()
 
+# Question lists come from the questions repository's cache, which is dropped whenever a
+# quiz's questions are written. Each question is serialized once per list, then reused as
+# an orjson.Fragment by every later payload. The serialized questions are kept with the
+# list they were built from and rebuilt once the repository hands out a new list, so they
+# never outlive it. The oldest quiz is evicted first.
+_questions_json: Dict[str, Tuple[List[DbQuestion], Dict[str, orjson.Fragment]]] = {}
+
+# Hash fields read by get_quiz_data
+_QUIZ_DATA_FIELDS = (
+    "session_id",
+    "quiz_id",
+    "quiz_state",
+    "current_question_number",
+    "current_question_id",
+    "current_question_end_timestamp",
+    "is_last_question",
+    "results",
+)
+
+
+def _cache_quiz_value(cache: dict, quiz_id: str, value):
+    if len(cache) >= QUIZ_QUESTIONS_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[quiz_id] = value
+    return value
+
+
+# Process-wide pool; redis-py uses the hiredis parser automatically when it is installed.
+command_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    password=REDIS_PASSWORD,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+
+# Publishes ARGV[3] on KEYS[2] only while the session in KEYS[1] is still in the quiz_state
+# and question number of the snapshot the payload was built from.
+_PUBLISH_IF_STATE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'quiz_state') == ARGV[1]
+    and redis.call('HGET', KEYS[1], 'current_question_number') == ARGV[2] then
+    return redis.call('PUBLISH', KEYS[2], ARGV[3])
+end
+return -1
+"""
+
+
+# Published messages start with one byte naming the payload type, so subscribers learn
+# the type without parsing the JSON that follows.
+_MESSAGE_TYPE_PREFIXES = {"update": b"u", "end": b"e"}
+_PREFIX_MESSAGE_TYPES = {prefix[0]: t for t, prefix in _MESSAGE_TYPE_PREFIXES.items()}
+
+
+def encode_channel_message(payload: dict) -> bytes:
+    """The bytes published for a payload: its type prefix followed by its JSON."""
+    return _MESSAGE_TYPE_PREFIXES[payload["type"]] + orjson.dumps(payload)
+
+
+@lru_cache(maxsize=4096)
+def _session_key(session_id: str) -> str:
+    """Cache key and pub/sub channel name of a session, built once per session."""
+    return f"session:{session_id}"
+
 
 class CacheManager:
     def __init__(self):
-        self.client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-        )
+        self.client = redis.Redis(connection_pool=command_pool)
+        self._clock_offset = 0.0
+        self._clock_synced_at: Optional[float] = None
         self.verify_connection()
 
     def verify_connection(self):
@@ -32,11 +104,11 @@ class CacheManager:
             self.client.ping()
             logger.info("Connected to Redis successfully.")
         except redis.RedisError as e:
-            logger.error(f"Failed to connect to Redis: {e}")
+            logger.error("Failed to connect to Redis: %s", e)
             raise
 
     def get_cache_key(self, session_id: str):
-        return f"session:{session_id}"
+        return _session_key(session_id)
 
     def get_time(self) -> tuple:
         """
@@ -47,21 +119,31 @@ class CacheManager:
             redis_time = self.client.time()
             return redis_time
         except redis.RedisError as e:
-            logger.error(f"Redis error: {e}")
+            logger.error("Redis error: %s", e)
             return None
 
     def get_timestamp(self) -> int:
         """
-        Gets the current timestamp from Redis server using TIME command.
-        Returns the timestamp in seconds.
+        Gets the current Redis server timestamp in seconds.
+        The offset between the local and the Redis clock is measured with the TIME command
+        at most once every CLOCK_SYNC_INTERVAL seconds, so all servers share one clock
+        without a round-trip per call.
         """
         try:
-            redis_time = self.get_time()
-            if redis_time:
-                return int(redis_time[0])
-            return None
+            now = time.monotonic()
+            if (
+                self._clock_synced_at is None
+                or now - self._clock_synced_at >= CLOCK_SYNC_INTERVAL
+            ):
+                redis_time = self.get_time()
+                if redis_time:
+                    self._clock_offset = (
+                        redis_time[0] + redis_time[1] / 1_000_000 - time.time()
+                    )
+                    self._clock_synced_at = now
+            return int(time.time() + self._clock_offset)
         except redis.RedisError as e:
-            logger.error(f"Redis error: {e}")
+            logger.error("Redis error: %s", e)
             return None
 
     def add_to_cache(
@@ -82,13 +164,13 @@ class CacheManager:
                 questions=quiz_questions,
             )
 
-            self.client.set(cache_key, json.dumps(quiz_data.model_dump_json()))
+            self.client.hset(cache_key, mapping=quiz_data.cache_fields())
 
-            logger.info(f"Session data added to cache for session {cache_key}")
+            logger.info("Session data added to cache for session %s", cache_key)
 
             return quiz_data
         except Exception as e:
-            logger.error(f"Error in add_session_data: {e}")
+            logger.error("Error in add_session_data: %s", e)
             return None
 
     def update_quiz_data(self, quiz_data: "QuizData") -> bool:
@@ -97,11 +179,11 @@ class CacheManager:
         """
         try:
             cache_key = self.get_cache_key(quiz_data.session_id)
-            self.client.set(cache_key, json.dumps(quiz_data.model_dump_json()))
-            logger.info(f"Session data updated in cache for session {cache_key}")
+            self.client.hset(cache_key, mapping=quiz_data.cache_state_fields())
+            logger.info("Session data updated in cache for session %s", cache_key)
             return True
         except Exception as e:
-            logger.error(f"Error in update_quiz_data: {e}")
+            logger.error("Error in update_quiz_data: %s", e)
             return False
 
     def remove_session_data(self, session_id: str) -> bool:
@@ -111,10 +193,10 @@ class CacheManager:
         try:
             cache_key = self.get_cache_key(session_id)
             self.client.delete(cache_key)
-            logger.info(f"Session data removed from cache for session {cache_key}")
+            logger.info("Session data removed from cache for session %s", cache_key)
             return True
         except Exception as e:
-            logger.error(f"Error in remove_session_data: {e}")
+            logger.error("Error in remove_session_data: %s", e)
             return False
 
     def get_quiz_data(self, session_id: str) -> Optional["QuizData"]:
@@ -123,52 +205,52 @@ class CacheManager:
         """
         try:
             cache_key = self.get_cache_key(session_id)
-            quiz_data = self.client.get(cache_key)
-            if quiz_data:
-                quiz_data_dict = json.loads(quiz_data.decode())
-                quiz_data = QuizData(
-                    session_id=quiz_data_dict.get("session_id"),
-                    quiz_state=quiz_data_dict.get("quiz_state"),
-                    quiz_id=quiz_data_dict.get("quiz_id"),
-                    current_question_number=quiz_data_dict.get(
-                        "current_question_number"
+            fields = dict(
+                zip(_QUIZ_DATA_FIELDS, self.client.hmget(cache_key, _QUIZ_DATA_FIELDS))
+            )
+            if fields["session_id"] is not None:
+                quiz_id = fields["quiz_id"].decode()
+                questions = db_manager.questions.get_quiz_questions(quiz_id)
+                current_question_id = fields["current_question_id"].decode()
+                current_question_end_timestamp = fields[
+                    "current_question_end_timestamp"
+                ]
+                results = fields["results"]
+                # Cached quiz data was validated before it was written
+                return QuizData.model_construct(
+                    session_id=fields["session_id"].decode(),
+                    quiz_state=QuizState(fields["quiz_state"].decode()),
+                    quiz_id=quiz_id,
+                    current_question_number=int(fields["current_question_number"]),
+                    current_question=next(
+                        (q for q in questions if q.question_id == current_question_id),
+                        None,
                     ),
-                    current_question=(
-                        DbQuestion.get_from_cache(
-                            quiz_data_dict.get("current_question")
-                        )
-                        if quiz_data_dict.get("current_question")
+                    current_question_end_timestamp=(
+                        int(current_question_end_timestamp)
+                        if current_question_end_timestamp
                         else None
                     ),
-                    current_question_end_timestamp=quiz_data_dict.get(
-                        "current_question_end_timestamp"
+                    is_last_question=fields["is_last_question"] == b"1",
+                    questions=questions,
+                    results=(
+                        [
+                            UserResults.model_construct(
+                                username=result.get("username"),
+                                score=result.get("score"),
+                                user_id=result.get("user_id"),
+                            )
+                            for result in orjson.loads(results)
+                        ]
+                        if results
+                        else None
                     ),
-                    questions=[
-                        DbQuestion.get_from_cache(q)
-                        for q in quiz_data_dict.get("questions")
-                    ],
                 )
-                if quiz_data_dict.get("results"):
-                    quiz_data.results = [
-                        UserResults(
-                            username=result.get("username"),
-                            score=result.get("score"),
-                            user_id=result.get("user_id"),
-                        )
-                        for result in quiz_data_dict.get("results")
-                    ]
-                return quiz_data
             else:
-                raise Errors.ServerError(
-                    status_code=500,
-                    error_code=5001,
-                    message="Quiz data not found in cache",
-                )
+                raise Errors.QUIZ_DATA_NOT_FOUND()
         except Exception as e:
-            logger.error(f"Error in get_quiz_data: {e}")
-            raise Errors.ServerError(
-                status_code=500, error_code=5001, message="Quiz data not found in cache"
-            )
+            logger.error("Error in get_quiz_data: %s", e)
+            raise Errors.QUIZ_DATA_NOT_FOUND()
 
     def clean_all_cache(self):
         """
@@ -176,10 +258,10 @@ class CacheManager:
         """
         try:
             self.client.flushall()
-            logger.info(f"Cache data cleaned")
+            logger.info("Cache data cleaned")
             return True
         except Exception as e:
-            logger.error(f"Error in clean_all_cache: {e}")
+            logger.error("Error in clean_all_cache: %s", e)
             return False
 
     def close(self):
@@ -199,36 +281,127 @@ class QuizData(BaseModel):
     current_question_number: int
     current_question: Optional[DbQuestion]
     current_question_end_timestamp: Optional[int] = None
+    is_last_question: bool = False
     questions: List[DbQuestion]
     results: Optional[List[UserResults]] = None
+    _cached_json: Optional[dict] = PrivateAttr(default=None)
+    _cached_client_json: Optional[dict] = PrivateAttr(default=None)
+    _cached_json_bytes: Optional[bytes] = PrivateAttr(default=None)
 
-    @field_validator("quiz_state")
-    def validate_quiz_state(cls, v):
-        return v.value
-
-    def model_dump_json(self):
+    def to_dict(self):
+        questions_json = self.questions_json()
         json_ = {
             "session_id": self.session_id,
             "quiz_state": self.quiz_state,
             "quiz_id": self.quiz_id,
             "current_question_number": self.current_question_number,
             "current_question": (
-                self.current_question.model_dump_json()
+                questions_json[self.current_question.question_id]
                 if self.current_question
                 else None
             ),
             "current_question_end_timestamp": self.current_question_end_timestamp,
-            "questions": [q.model_dump_json() for q in self.questions],
+            "is_last_question": self.is_last_question,
+            "questions": [questions_json[q.question_id] for q in self.questions],
         }
         if self.results:
             json_["results"] = sorted(
-                [r.model_dump_json() for r in self.results],
+                [r.to_dict() for r in self.results],
                 key=lambda x: x.get("score"),
                 reverse=True,
             )
         return json_
 
-    def client_model_dump_json(self):
+    def questions_json(self) -> Dict[str, orjson.Fragment]:
+        """
+        Returns the serialized questions of this quiz by question_id, building them once per
+        question list.
+        """
+        cached = _questions_json.get(self.quiz_id)
+        if cached is None or cached[0] is not self.questions:
+            cached = _cache_quiz_value(
+                _questions_json,
+                self.quiz_id,
+                (
+                    self.questions,
+                    {
+                        q.question_id: orjson.Fragment(orjson.dumps(q.to_dict()))
+                        for q in self.questions
+                    },
+                ),
+            )
+        return cached[1]
+
+    def cache_fields(self) -> dict:
+        """
+        Returns every field of the session's Redis hash.
+        """
+        fields = self.cache_state_fields()
+        fields["session_id"] = self.session_id
+        fields["quiz_id"] = self.quiz_id
+        return fields
+
+    def cache_state_fields(self) -> dict:
+        """
+        Returns the Redis hash fields that state transitions change.
+        The questions never change, so they are only written by cache_fields.
+        Redis has no null, so missing values are stored as empty strings.
+        """
+        return {
+            "quiz_state": self.quiz_state.value,
+            "current_question_number": self.current_question_number,
+            "current_question_id": (
+                self.current_question.question_id if self.current_question else ""
+            ),
+            "current_question_end_timestamp": (
+                self.current_question_end_timestamp
+                if self.current_question_end_timestamp is not None
+                else ""
+            ),
+            "is_last_question": int(self.is_last_question),
+            "results": (
+                orjson.dumps(self.json_cached()["results"]) if self.results else ""
+            ),
+        }
+
+    @cached_property
+    def questions_by_id(self) -> Dict[str, DbQuestion]:
+        return {q.question_id: q for q in self.questions}
+
+    def json_cached(self) -> dict:
+        """
+        Returns the to_dict output, recomputing it only after a state transition.
+        Questions in it are orjson.Fragment values, so it is only meant to be serialized with orjson.
+        The returned dict is shared between payloads and must be treated as read-only.
+        """
+        if self._cached_json is None:
+            self._cached_json = self.to_dict()
+        return self._cached_json
+
+    def client_json_cached(self) -> dict:
+        """
+        Returns the client_to_dict output, recomputing it only after a state transition.
+        The returned dict is shared between payloads and must be treated as read-only.
+        """
+        if self._cached_client_json is None:
+            self._cached_client_json = self.client_to_dict()
+        return self._cached_client_json
+
+    def json_bytes_cached(self) -> bytes:
+        """
+        Returns json_cached() serialized to JSON bytes, recomputing it only after a state transition.
+        Embedded as an orjson.Fragment inside payloads.
+        """
+        if self._cached_json_bytes is None:
+            self._cached_json_bytes = orjson.dumps(self.json_cached())
+        return self._cached_json_bytes
+
+    def invalidate_json_cache(self):
+        self._cached_json = None
+        self._cached_client_json = None
+        self._cached_json_bytes = None
+
+    def client_to_dict(self):
         """
         This function is to send the data to the client. Hiding the next question and answers.
         """
@@ -238,38 +411,43 @@ class QuizData(BaseModel):
             "quiz_id": self.quiz_id,
             "current_question_number": self.current_question_number,
             "current_question": (
-                self.current_question.client_model_dump_json()
-                if self.current_question
-                else None
+                self.current_question.client_dict if self.current_question else None
             ),
             "current_question_end_timestamp": self.current_question_end_timestamp,
         }
 
     def start_quiz(self, current_timestamp: int):
+        self.invalidate_json_cache()
         self.quiz_state = QuizState.ACTIVE
         self.current_question_number = 1
         self.current_question = self.questions[self.current_question_number - 1]
+        self.is_last_question = self.current_question_number == len(self.questions)
         self.current_question_end_timestamp = (
             current_timestamp + self.current_question.seconds_to_answer
         )
 
     def timeout_question(self):
+        self.invalidate_json_cache()
         self.quiz_state = QuizState.QUESTION_TIMEDOUT
         self.current_question_end_timestamp = None
 
     def next_question(self, current_timestamp: int):
+        self.invalidate_json_cache()
         self.current_question_number += 1
         self.current_question = self.questions[self.current_question_number - 1]
+        self.is_last_question = self.current_question_number == len(self.questions)
         self.quiz_state = QuizState.ACTIVE
         self.current_question_end_timestamp = (
             current_timestamp + self.current_question.seconds_to_answer
         )
 
     def end_quiz(self):
+        self.invalidate_json_cache()
         self.quiz_state = QuizState.ENDED
         self.current_question_end_timestamp = None
 
     def get_results(self):
+        self.invalidate_json_cache()
         self.quiz_state = QuizState.SHOW_RESULTS
         self.current_question_end_timestamp = None
         self.current_question = None
@@ -284,85 +462,209 @@ class QuizData(BaseModel):
         return pretty_str
 
 
+@dataclass(slots=True, frozen=True)
+class ChannelMessage:
+    """
+    A published payload as received from Redis. The type comes from the message's prefix
+    byte and the frame holds the JSON bytes after it, so every local connection forwards
+    them without decoding or encoding the payload again.
+    """
+
+    type: Optional[str]
+    frame: orjson.Fragment
+
+
 class PubSubManager:
     def __init__(self):
-        self.client = redis.Redis(
+        self.client = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                password=REDIS_PASSWORD,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            )
+        )
+        # All session channels share one subscribed connection, read by a single task
+        # that hands every message to the local queues of that session's connections.
+        self.subscription_client = aioredis.Redis(
             host=REDIS_HOST,
             port=REDIS_PORT,
             password=REDIS_PASSWORD,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
         )
-        self.publish_queue = asyncio.Queue()
+        self.pubsub = self.subscription_client.pubsub(ignore_subscribe_messages=True)
+        self._publish_if_state = self.client.register_script(_PUBLISH_IF_STATE_SCRIPT)
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        # Single consumer (_publish_loop): a plain deque plus one wakeup future
+        # avoids asyncio.Queue's per-item getter/putter bookkeeping.
+        self.publish_queue: deque = deque()
+        self._publish_waiter: Optional[asyncio.Future] = None
+
+    async def update_quiz_data_and_publish(
+        self, quiz_data: "QuizData", channel: str, payload: dict
+    ) -> bool:
+        """
+        Update session data in the cache and publish the payload in a single round-trip.
+        """
+        try:
+            cache_key = _session_key(quiz_data.session_id)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(cache_key, mapping=quiz_data.cache_state_fields())
+                pipe.publish(channel, encode_channel_message(payload))
+                await pipe.execute()
+            logger.info("Session data updated in cache for session %s", cache_key)
+            return True
+        except Exception as e:
+            logger.error("Error in update_quiz_data_and_publish: %s", e)
+            return False
+
+    async def publish_if_state_unchanged(
+        self, quiz_data: "QuizData", channel: str, payload: dict
+    ) -> bool:
+        """
+        Publish the payload without writing the session data, and only if no state
+        transition happened since quiz_data was read, so a stale snapshot is never broadcast.
+        Returns False if the payload was dropped or publishing failed.
+        """
+        try:
+            published = await self._publish_if_state(
+                keys=[_session_key(quiz_data.session_id), channel],
+                args=[
+                    quiz_data.quiz_state.value,
+                    quiz_data.current_question_number,
+                    encode_channel_message(payload),
+                ],
+            )
+            return published >= 0
+        except Exception as e:
+            logger.error("Error in publish_if_state_unchanged: %s", e)
+            return False
 
     def add_payload_to_publish_queue(self, session_id: str, payload: dict) -> None:
         try:
             channel = self.get_session_channel(session_id)
             message = {"payload": payload, "channel": channel}
-            self.publish_queue.put_nowait(message)
+            self.publish_queue.append(message)
+            waiter = self._publish_waiter
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
         except Exception as e:
-            logger.error(f"Error in add_payload_to_publish_queue: {e}")
+            logger.error("Error in add_payload_to_publish_queue: %s", e)
+
+    async def _wait_for_publish_queue(self) -> None:
+        """Wait until a producer appends to an empty publish queue."""
+        self._publish_waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._publish_waiter
+        finally:
+            self._publish_waiter = None
 
     async def _publish_loop(self) -> None:
-        """Publishes a message to a Redis channel for a session."""
+        """
+        Publishes queued messages to their Redis session channels.
+        Everything queued, up to PUBLISH_BATCH_SIZE messages, goes out in one pipeline.
+        """
         while True:
             try:
-                message = await self.publish_queue.get()
-                payload = message.get("payload")
-                channel = message.get("channel")
-                subscribers = self.client.publish(channel, json.dumps(payload))
-                logger.debug(f"Broadcasted message to {subscribers} subscribers")
+                if not self.publish_queue:
+                    await self._wait_for_publish_queue()
+                while self.publish_queue:
+                    async with self.client.pipeline(transaction=False) as pipe:
+                        for _ in range(
+                            min(len(self.publish_queue), PUBLISH_BATCH_SIZE)
+                        ):
+                            message = self.publish_queue.popleft()
+                            payload = message.get("payload")
+                            channel = message.get("channel")
+                            pipe.publish(channel, encode_channel_message(payload))
+                        subscribers = await pipe.execute()
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Broadcasted messages to %s subscribers", subscribers
+                        )
             except Exception as e:
-                logger.error(f"Error in _publish_loop: {e}")
+                logger.error("Error in _publish_loop: %s", e)
 
-    async def pubsub_listener_to_async(self, session_id: str) -> AsyncGenerator:
-        """Yields messages from a Redis channel for a session."""
-        channel = self.get_session_channel(session_id)
-        try:
-            logger.debug(f"Subscribing to channel: {channel}")
-            while True:
-                message = self.pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1.0
-                )
-                if message:
-                    yield message
-                await asyncio.sleep(0.1)
-        except Exception as e:
-            logger.error(f"Error in pubsub_listener_to_async: {e}")
-
-    async def listen_to_channel(self, session_id: str) -> AsyncGenerator[dict, None]:
+    async def listen_to_channel(
+        self, session_id: str
+    ) -> AsyncGenerator[ChannelMessage, None]:
         """
         Listen to a specific channel and yield messages.
         This function is for each WebSocket connection to listen to the channel.
+        The channel is subscribed on the shared connection while any local connection listens to it.
         """
+        channel = self.get_session_channel(session_id)
+        queue = asyncio.Queue()
         try:
-            channel = self.get_session_channel(session_id)
-
-            pubsub = self.client.pubsub()
-
-            pubsub.subscribe(channel)
-
-            logger.debug(f"Starting listener for channel: {channel}")
+            subscribers = self._subscribers.get(channel)
+            if subscribers is None:
+                subscribers = self._subscribers[channel] = []
+                await self.pubsub.subscribe(channel)
+            subscribers.append(queue)
+            if self._reader_task is None or self._reader_task.done():
+                # listen() returns once no channel is subscribed, so the reader is restarted on demand
+                self._reader_task = asyncio.create_task(
+                    self._read_loop(), name="Pubsub Reader Task"
+                )
 
             while True:
-                message = pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1.0
-                )
-                if message:
-                    try:
-                        data = json.loads(message["data"])
-                        yield data
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to decode message on {channel}: {e}")
-                await asyncio.sleep(0.1)
+                data = await queue.get()
+                if isinstance(data, Exception):
+                    raise data
+                yield data
 
         except Exception as e:
-            logger.error(f"Error in channel listener for {channel}: {e}")
-            raise Errors.ServerError(
-                status_code=500, error_code=5001, message="Quiz data not found in cache"
-            )
+            logger.error("Error in channel listener for %s: %s", channel, e)
+            raise Errors.QUIZ_DATA_NOT_FOUND()
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None and queue in subscribers:
+                subscribers.remove(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+                    await self.pubsub.unsubscribe(channel)
+
+    async def _read_loop(self) -> None:
+        """Read messages from Redis and hand a copy to every local subscriber of their channel."""
+        try:
+            async for message in self.pubsub.listen():
+                if message["type"] != "message":
+                    # Replies to the health check loop's PING
+                    continue
+                channel = message["channel"].decode()
+                raw = message["data"]
+                message_type = _PREFIX_MESSAGE_TYPES.get(raw[0]) if raw else None
+                if message_type is None:
+                    logger.error("Unknown message type on %s", channel)
+                    continue
+                message = ChannelMessage(message_type, orjson.Fragment(raw[1:]))
+                for queue in self._subscribers.get(channel, ()):
+                    queue.put_nowait(message)
+        except Exception as e:
+            logger.error("Error in pubsub reader: %s", e)
+            for subscribers in self._subscribers.values():
+                for queue in subscribers:
+                    queue.put_nowait(e)
 
     def get_session_channel(self, session_id: str) -> str:
         """Get the channel name for a session."""
-        return f"session:{session_id}"
+        return _session_key(session_id)
+
+    async def _health_check_loop(self) -> None:
+        """
+        Ping Redis every REDIS_HEALTH_CHECK_INTERVAL seconds, so dropped connections are
+        noticed and replaced while idle rather than on the next broadcast.
+        """
+        while True:
+            await asyncio.sleep(REDIS_HEALTH_CHECK_INTERVAL)
+            try:
+                await self.client.ping()
+                if self.pubsub.subscribed:
+                    await self.pubsub.ping()
+            except Exception as e:
+                logger.error("Redis health check failed: %s", e)
 
     async def stop_publish_loop(self):
         """Stop the publish loop"""
@@ -371,12 +673,19 @@ class PubSubManager:
 
     async def close(self):
         """Close the Redis connection."""
-        self.client.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._health_check_task.cancel()
+        self._subscribers.clear()
+        await self.pubsub.aclose()
+        await self.client.aclose()
+        await self.subscription_client.aclose()
         await self.stop_publish_loop()
         logger.info("PubSubManager closed")
 
     async def start(self):
         self._publish_loop_task = asyncio.create_task(self._publish_loop())
+        self._health_check_task = asyncio.create_task(self._health_check_loop())
         logger.info("PubSubManager started")
         return self
 
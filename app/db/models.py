@@ -1,9 +1,14 @@
-import json
+import io
 import os
 import logging
-from typing import List, Optional
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import orjson
 import psycopg2
-from psycopg2.extras import DictCursor
+from psycopg2.extras import execute_values, register_default_jsonb
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from app.db.schemas import (
     DbUser,
     UserPermission,
@@ -19,169 +24,397 @@ from app.api.errors import Errors
 logger = logging.getLogger(__name__)
 
 DB_URL = os.getenv("DB_URL")
+DB_POOL_MIN_CONNECTIONS = int(os.getenv("DB_POOL_MIN_CONNECTIONS", "2"))
+# Sized to the threadpool running the sync endpoints (40 threads by default), plus the
+# answers writer, so requests wait for a connection only under unusual load
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "41"))
+# Seconds to wait for a free pooled connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Rows per INSERT statement for bulk inserts; all pages are committed together
+INSERT_PAGE_SIZE = 1000
+# Bulk question and answer inserts of at least this many rows are streamed with COPY
+COPY_MIN_ROWS = int(os.getenv("COPY_MIN_ROWS", "500"))
+USER_CACHE_SIZE = 4096
+QUIZ_QUESTIONS_CACHE_SIZE = 1024
+
+register_default_jsonb(loads=orjson.loads, globally=True)
+
+_connection_pool: Optional["BlockingConnectionPool"] = None
+
+# Question sets rarely change after a quiz is created, so they are cached per quiz for the
+# whole process and dropped on every write; the oldest quiz is evicted first.
+_quiz_questions: Dict[str, List[DbQuestion]] = {}
+
+# The connection of the DbManager.transaction() block running in the current context, if any
+_transaction_connection: ContextVar[Optional[psycopg2.extensions.connection]] = (
+    ContextVar("transaction_connection", default=None)
+)
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """A connection that remembers which statements were prepared on it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    A ThreadedConnectionPool that waits up to DB_POOL_TIMEOUT seconds for a free
+    connection when all of them are checked out, instead of raising right away.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._available = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=DB_POOL_TIMEOUT):
+            raise PoolError("timed out waiting for a pooled connection")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._available.release()
+
+
+def get_connection_pool() -> BlockingConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    """
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = BlockingConnectionPool(
+            DB_POOL_MIN_CONNECTIONS,
+            DB_POOL_MAX_CONNECTIONS,
+            dsn=DB_URL,
+            connection_factory=PreparingConnection,
+        )
+    return _connection_pool
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_row(*values) -> str:
+    """
+    Formats one row for COPY ... FROM STDIN in text format.
+    """
+    return (
+        "\t".join(
+            "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+            for value in values
+        )
+        + "\n"
+    )
 
 
 class BaseRepository:
-    def __init__(self, connection: psycopg2.extensions.connection):
-        self.connection = connection
-        self.cursor = self.connection.cursor(cursor_factory=DictCursor)
+    def __init__(self, pool: ThreadedConnectionPool):
+        self.pool = pool
 
-    def close(self):
-        if self.connection:
-            self.connection.close()
+    @contextmanager
+    def _cursor(self):
+        """
+        Yields a cursor on the connection of the surrounding transaction, if there is one.
+        Otherwise a connection is checked out of the pool, committed (or rolled back on error)
+        when the block exits, and returned to the pool.
+        Rows are plain tuples, in the order of the SELECT list.
+        """
+        connection = _transaction_connection.get()
+        if connection is not None:
+            with connection.cursor() as cursor:
+                yield cursor
+            return
+
+        connection = self.pool.getconn()
+        try:
+            with connection.cursor() as cursor:
+                yield cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self.pool.putconn(connection)
+
+    def _copy_upsert(
+        self, cursor, table: str, columns: str, rows: List[tuple], on_conflict: str
+    ):
+        """
+        Streams rows with COPY into a temporary copy of the table, then upserts them
+        into the table with a single INSERT ... SELECT and the given ON CONFLICT clause.
+        """
+        buffer = io.StringIO()
+        buffer.writelines(_copy_row(*row) for row in rows)
+        buffer.seek(0)
+        cursor.execute(
+            f"CREATE TEMP TABLE {table}_import "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY {table}_import ({columns}) FROM STDIN WITH (FORMAT text)", buffer
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT {columns} FROM {table}_import {on_conflict}"
+        )
+        # Dropped now too, so a surrounding transaction can copy again
+        cursor.execute(f"DROP TABLE {table}_import")
+
+    def _execute_prepared(self, cursor, name: str, statement: str, params: tuple):
+        """
+        Executes a statement that is parsed and planned once per connection,
+        the first time it runs there, and only bound and executed afterwards.
+        """
+        connection = cursor.connection
+        if name not in connection.prepared_statements:
+            cursor.execute(f"PREPARE {name} AS {statement}")
+            connection.prepared_statements.add(name)
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
 
 
 class QuestionsRepository(BaseRepository):
-    def create_table(self):
-        """Create the questions table if it doesn't exist."""
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS questions (
-                question_id TEXT,
-                quiz_id TEXT NOT NULL,
-                question TEXT NOT NULL,
-                question_number INTEGER NOT NULL,
-                question_type TEXT NOT NULL,
-                points INTEGER NOT NULL,
-                answers JSONB,
-                seconds_to_answer INTEGER NOT NULL,
-                PRIMARY KEY (question_id, quiz_id),
-                FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id)
-            )
-            """
-        )
-        self.connection.commit()
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS questions (
+            question_id TEXT,
+            quiz_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            question_number INTEGER NOT NULL,
+            question_type TEXT NOT NULL,
+            points INTEGER NOT NULL,
+            answers JSONB,
+            seconds_to_answer INTEGER NOT NULL,
+            PRIMARY KEY (question_id, quiz_id),
+            FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id)
+        );
+        -- get_quiz_questions filters on quiz_id and orders by question_number
+        CREATE INDEX IF NOT EXISTS idx_questions_quiz_number
+        ON questions (quiz_id, question_number)
+        """
 
     def insert_question(self, question: DbQuestion) -> bool:
         """
         Adds or updates a question to the questions table.
         """
+        return self.insert_questions([question])
+
+    def insert_questions(self, questions: List[DbQuestion]) -> bool:
+        """
+        Adds or updates several questions with a single statement and commit.
+        """
+        for question in questions:
+            _quiz_questions.pop(question.quiz_id, None)
+        if len(questions) >= COPY_MIN_ROWS:
+            return self.copy_questions(questions)
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO questions (
+            with self._cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO questions (
+                        question_id, quiz_id, question, question_number,
+                        question_type, points, answers, seconds_to_answer
+                    )
+                    VALUES %s
+                    ON CONFLICT (question_id, quiz_id) DO UPDATE SET
+                        question = EXCLUDED.question,
+                        question_number = EXCLUDED.question_number,
+                        question_type = EXCLUDED.question_type,
+                        points = EXCLUDED.points,
+                        answers = EXCLUDED.answers,
+                        seconds_to_answer = EXCLUDED.seconds_to_answer
+                    """,
+                    [
+                        (
+                            question.question_id,
+                            question.quiz_id,
+                            question.question,
+                            question.question_number,
+                            question.question_type,
+                            question.points,
+                            question.answers.to_json_bytes().decode(),
+                            question.seconds_to_answer,
+                        )
+                        for question in questions
+                    ],
+                    page_size=INSERT_PAGE_SIZE,
+                )
+            return True
+        except Exception as e:
+            logger.error("Error inserting questions: %s", e)
+            raise Errors.ServerError()
+
+    def copy_questions(self, questions: List[DbQuestion]) -> bool:
+        """
+        Adds or updates many questions by streaming them with COPY into a temporary table,
+        then upserting them into the questions table with a single statement.
+        """
+        for question in questions:
+            _quiz_questions.pop(question.quiz_id, None)
+        try:
+            with self._cursor() as cursor:
+                self._copy_upsert(
+                    cursor,
+                    "questions",
+                    """
                     question_id, quiz_id, question, question_number,
                     question_type, points, answers, seconds_to_answer
+                    """,
+                    [
+                        (
+                            question.question_id,
+                            question.quiz_id,
+                            question.question,
+                            question.question_number,
+                            question.question_type,
+                            question.points,
+                            question.answers.to_json_bytes().decode(),
+                            question.seconds_to_answer,
+                        )
+                        for question in questions
+                    ],
+                    """
+                    ON CONFLICT (question_id, quiz_id) DO UPDATE SET
+                        question = EXCLUDED.question,
+                        question_number = EXCLUDED.question_number,
+                        question_type = EXCLUDED.question_type,
+                        points = EXCLUDED.points,
+                        answers = EXCLUDED.answers,
+                        seconds_to_answer = EXCLUDED.seconds_to_answer
+                    """,
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (question_id, quiz_id) DO UPDATE SET
-                    question = EXCLUDED.question,
-                    question_number = EXCLUDED.question_number,
-                    question_type = EXCLUDED.question_type,
-                    points = EXCLUDED.points,
-                    answers = EXCLUDED.answers,
-                    seconds_to_answer = EXCLUDED.seconds_to_answer
-                """,
-                (
-                    question.question_id,
-                    question.quiz_id,
-                    question.question,
-                    question.question_number,
-                    question.question_type,
-                    question.points,
-                    json.dumps(question.answers.model_dump_json()),
-                    question.seconds_to_answer,
-                ),
-            )
-            self.connection.commit()
             return True
         except Exception as e:
-            logger.error(f"Error inserting question: {e}")
-            return False
+            logger.error("Error copying questions: %s", e)
+            raise Errors.ServerError()
 
     def delete_question(self, question_id: str, quiz_id: str) -> bool:
         """
         Deletes a question from the questions table.
         """
+        _quiz_questions.pop(quiz_id, None)
         try:
-            self.cursor.execute(
-                """
-                DELETE FROM questions
-                WHERE question_id = %s AND quiz_id = %s
-                """,
-                (question_id, quiz_id),
-            )
-            self.connection.commit()
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM questions
+                    WHERE question_id = %s AND quiz_id = %s
+                    """,
+                    (question_id, quiz_id),
+                )
             return True
         except Exception as e:
-            logger.error(f"Error deleting question: {e}")
+            logger.error("Error deleting question: %s", e)
             return False
 
     def get_quiz_questions(self, quiz_id: str) -> List[DbQuestion]:
         """
-        Gets all questions for a quiz.
+        Gets all questions for a quiz. The returned list is shared and must be treated as read-only.
+        """
+        questions = _quiz_questions.get(quiz_id)
+        if questions is None:
+            questions = self.fetch_quiz_questions(quiz_id)
+            if len(_quiz_questions) >= QUIZ_QUESTIONS_CACHE_SIZE:
+                del _quiz_questions[next(iter(_quiz_questions))]
+            _quiz_questions[quiz_id] = questions
+        return questions
+
+    def fetch_quiz_questions(self, quiz_id: str) -> List[DbQuestion]:
+        """
+        Reads all questions for a quiz from the database.
         """
         try:
-            self.cursor.execute(
-                """
-                SELECT question_id, question, question_number, question_type,
-                       points, answers, seconds_to_answer
-                FROM questions
-                WHERE quiz_id = %s
-                ORDER BY question_number
-                """,
-                (quiz_id,),
-            )
-            rows = self.cursor.fetchall()
-            return [
-                DbQuestion.get_from_db(
-                    question_id=row["question_id"],
-                    question=row["question"],
-                    question_number=row["question_number"],
-                    question_type=row["question_type"],
-                    points=row["points"],
-                    answers=row["answers"],
-                    seconds_to_answer=row["seconds_to_answer"],
-                    quiz_id=quiz_id,
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "get_quiz_questions",
+                    """
+                    SELECT question_id, question, question_number, question_type,
+                           points, answers, seconds_to_answer
+                    FROM questions
+                    WHERE quiz_id = $1
+                    ORDER BY question_number
+                    """,
+                    (quiz_id,),
                 )
-                for row in rows
-            ]
-        except Exception as e:
-            logger.error(f"Error getting quiz questions: {e}")
-            raise Errors.ServerError
+                return [
+                    DbQuestion.get_from_db(
+                        question_id=question_id,
+                        question=question,
+                        question_number=question_number,
+                        question_type=question_type,
+                        points=points,
+                        # JSONB is already decoded by the orjson jsonb loader
+                        answers=answers,
+                        seconds_to_answer=seconds_to_answer,
+                        quiz_id=quiz_id,
+                    )
+                    for (
+                        question_id,
+                        question,
+                        question_number,
+                        question_type,
+                        points,
+                        answers,
+                        seconds_to_answer,
+                    ) in cursor.fetchall()
+                ]
+        except psycopg2.Error as e:
+            logger.error("Error getting quiz questions: %s", e)
+            raise Errors.ServerError()
 
     def delete_table(self) -> bool:
         """
         Deletes the questions table.
         """
+        _quiz_questions.clear()
         try:
-            self.cursor.execute(
-                """
-                DROP TABLE IF EXISTS questions
-                """
-            )
-            self.connection.commit()
-
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    DROP TABLE IF EXISTS questions
+                    """
+                )
             return True
         except Exception as e:
-            logger.error(f"Error deleting table: {e}")
+            logger.error("Error deleting table: %s", e)
             return False
 
 
 class QuizParticipentsRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_participents (
-                quiz_id TEXT,
-                session_id TEXT,
-                user_id TEXT,
-                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                left_at TIMESTAMP,
-                score INTEGER DEFAULT 0,
-                PRIMARY KEY (quiz_id, session_id, user_id),
-                FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (session_id) REFERENCES quiz_sessions(session_id)
-            )
-            """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quiz_participents (
+            quiz_id TEXT,
+            session_id TEXT,
+            user_id TEXT,
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            left_at TIMESTAMP,
+            score INTEGER DEFAULT 0,
+            PRIMARY KEY (quiz_id, session_id, user_id),
+            FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (session_id) REFERENCES quiz_sessions(session_id)
         )
-        self.connection.commit()
+        """
 
-    def add_participant(self, participent: DbParticipent) -> bool:
+    def add_participant(self, participent: DbParticipent) -> DbParticipent:
+        """
+        Adds or updates a participant and returns the row as stored, which keeps the
+        original joined_at when the participant rejoins.
+        Score updates are frequent and cheap to lose, so when the call commits on its own
+        connection the commit does not wait for the WAL flush. Within a
+        DbManager.transaction() block the block's other writes keep synchronous commit.
+        """
         try:
-            self.cursor.execute(
-                """
+            statement = """
                 INSERT INTO quiz_participents (
                     quiz_id, session_id, user_id, score, joined_at, left_at
                 )
@@ -189,364 +422,494 @@ class QuizParticipentsRepository(BaseRepository):
                 ON CONFLICT (quiz_id, session_id, user_id) DO UPDATE SET
                     score = EXCLUDED.score,
                     left_at = EXCLUDED.left_at
-                """,
-                (
-                    participent.quiz_id,
-                    participent.session_id,
-                    participent.user_id,
-                    participent.score,
-                    participent.joined_at,
-                    participent.left_at,
-                ),
+                RETURNING quiz_id, user_id, session_id, score, joined_at, left_at
+                """
+            if _transaction_connection.get() is None:
+                # Sent with the insert, so it adds no round trip
+                statement = "SET LOCAL synchronous_commit = off;" + statement
+            with self._cursor() as cursor:
+                cursor.execute(
+                    statement,
+                    (
+                        participent.quiz_id,
+                        participent.session_id,
+                        participent.user_id,
+                        participent.score,
+                        participent.joined_at,
+                        participent.left_at,
+                    ),
+                )
+                quiz_id, user_id, session_id, score, joined_at, left_at = (
+                    cursor.fetchone()
+                )
+            return DbParticipent(
+                quiz_id=quiz_id,
+                user_id=user_id,
+                session_id=session_id,
+                score=score,
+                joined_at=joined_at,
+                left_at=left_at,
             )
-            self.connection.commit()
-            return True
         except Exception as e:
-            logger.error(f"Error adding participent: {e}")
-            return False
+            logger.error("Error adding participent: %s", e)
+            raise Errors.ServerError()
 
 
 class QuizPermissionsRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_permissions (
-                quiz_id TEXT,
-                user_id TEXT,
-                permission TEXT NOT NULL,
-                PRIMARY KEY (quiz_id, user_id),
-                FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-            """
-        )
-        self.connection.commit()
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quiz_permissions (
+            quiz_id TEXT,
+            user_id TEXT,
+            permission TEXT NOT NULL,
+            PRIMARY KEY (quiz_id, user_id),
+            FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        );
+        -- Lets get_user_permission read the permission from the index alone
+        CREATE INDEX IF NOT EXISTS idx_quiz_permissions_covering
+        ON quiz_permissions (quiz_id, user_id) INCLUDE (permission)
+        """
 
     def add_permission(self, user_permission: UserPermission) -> bool:
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO quiz_permissions (quiz_id, user_id, permission)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (quiz_id, user_id) DO UPDATE SET
-                    permission = EXCLUDED.permission
-                """,
-                (
-                    user_permission.quiz_id,
-                    user_permission.user_id,
-                    user_permission.permission,
-                ),
-            )
-            self.connection.commit()
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "add_permission",
+                    """
+                    INSERT INTO quiz_permissions (quiz_id, user_id, permission)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (quiz_id, user_id) DO UPDATE SET
+                        permission = EXCLUDED.permission
+                    """,
+                    (
+                        user_permission.quiz_id,
+                        user_permission.user_id,
+                        user_permission.permission,
+                    ),
+                )
             return True
         except Exception as e:
-            logger.error(f"Error adding quiz permission: {e}")
-            return False
+            logger.error("Error adding quiz permission: %s", e)
+            raise Errors.ServerError()
 
     def get_user_permission(
         self, quiz_id: str, user_id: str
     ) -> Optional[UserPermission]:
         try:
-            self.cursor.execute(
-                """
-                SELECT permission
-                FROM quiz_permissions
-                WHERE quiz_id = %s AND user_id = %s
-                """,
-                (quiz_id, user_id),
-            )
-            row = self.cursor.fetchone()
-            return (
-                UserPermission.get_from_db(quiz_id, user_id, row["permission"])
-                if row
-                else None
-            )
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "get_user_permission",
+                    """
+                    SELECT permission
+                    FROM quiz_permissions
+                    WHERE quiz_id = $1 AND user_id = $2
+                    """,
+                    (quiz_id, user_id),
+                )
+                row = cursor.fetchone()
+                return (
+                    UserPermission.get_from_db(quiz_id, user_id, row[0])
+                    if row
+                    else None
+                )
         except psycopg2.Error as e:
-            logger.error(f"Error getting user permission: {e}")
+            logger.error("Error getting user permission: %s", e)
             return None
 
 
 class UsersRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                email TEXT,
-                create_date TIMESTAMP
-            )
-            """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            email TEXT,
+            create_date TIMESTAMP
         )
-        self.connection.commit()
+        """
+
+    def __init__(self, pool: ThreadedConnectionPool):
+        super().__init__(pool)
+        # Users are only ever created with a fresh id, so found users are cached
+        # in-process; the oldest entry is evicted first.
+        self._users: Dict[str, DbUser] = {}
 
-    def add_user(self, user: DbUser) -> bool:
+    def add_user(self, user: DbUser) -> DbUser:
+        """
+        Adds or updates a user and returns the row as stored, which keeps the
+        original create_date when the user already exists.
+        """
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO users (user_id, username, email, create_date)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (user_id) DO UPDATE SET
-                    username = EXCLUDED.username,
-                    email = EXCLUDED.email
-                """,
-                (user.user_id, user.username, user.email, user.create_date),
-            )
-            self.connection.commit()
-            return True
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "add_user",
+                    """
+                    INSERT INTO users (user_id, username, email, create_date)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        username = EXCLUDED.username,
+                        email = EXCLUDED.email
+                    RETURNING user_id, username, email, create_date
+                    """,
+                    (user.user_id, user.username, user.email, user.create_date),
+                )
+                row = cursor.fetchone()
+            self._users.pop(user.user_id, None)
+            return DbUser.get_from_db(*row)
         except psycopg2.Error as e:
-            logger.error(f"Error adding user: {e}")
-            return False
+            logger.error("Error adding user: %s", e)
+            raise Errors.ServerError()
 
     def get_user(self, user_id: str) -> Optional[DbUser]:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self.fetch_user(user_id)
+            if user is not None:
+                if len(self._users) >= USER_CACHE_SIZE:
+                    del self._users[next(iter(self._users))]
+                self._users[user_id] = user
+        return user
+
+    def fetch_user(self, user_id: str) -> Optional[DbUser]:
         try:
-            self.cursor.execute(
-                """
-                SELECT user_id, username, email, create_date
-                FROM users
-                WHERE user_id = %s
-                """,
-                (user_id,),
-            )
-            row = self.cursor.fetchone()
-            return (
-                DbUser.get_from_db(
-                    user_id=row["user_id"],
-                    username=row["username"],
-                    email=row["email"],
-                    create_date=row["create_date"],
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "get_user",
+                    """
+                    SELECT user_id, username, email, create_date
+                    FROM users
+                    WHERE user_id = $1
+                    """,
+                    (user_id,),
                 )
-                if row
-                else None
-            )
+                row = cursor.fetchone()
+                return DbUser.get_from_db(*row) if row else None
         except psycopg2.Error as e:
-            logger.error(f"Error getting user: {e}")
+            logger.error("Error getting user: %s", e)
             return None
 
 
 class QuizSessionsRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_sessions (
-                session_id TEXT PRIMARY KEY,
-                quiz_id TEXT,
-                room_id TEXT,
-                start_datetime TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                end_datetime TIMESTAMP,
-                moderator_id TEXT,
-                FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
-                FOREIGN KEY (moderator_id) REFERENCES users(user_id)
-            )
-            """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quiz_sessions (
+            session_id TEXT PRIMARY KEY,
+            quiz_id TEXT,
+            room_id TEXT,
+            start_datetime TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            end_datetime TIMESTAMP,
+            moderator_id TEXT,
+            FOREIGN KEY (quiz_id) REFERENCES quizzes(quiz_id),
+            FOREIGN KEY (moderator_id) REFERENCES users(user_id)
         )
-        self.connection.commit()
+        """
 
-    def add_session(self, session: DbSession) -> bool:
+    def add_session(self, session: DbSession) -> DbSession:
+        """
+        Adds or updates a session and returns the row as stored, which keeps the
+        original start_datetime when the session already exists.
+        """
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO quiz_sessions (
-                    session_id, quiz_id, room_id, start_datetime,
-                    end_datetime, moderator_id
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "add_session",
+                    """
+                    INSERT INTO quiz_sessions (
+                        session_id, quiz_id, room_id, start_datetime,
+                        end_datetime, moderator_id
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (session_id) DO UPDATE SET
+                        end_datetime = EXCLUDED.end_datetime
+                    RETURNING quiz_id, room_id, session_id, moderator_id,
+                              start_datetime, end_datetime
+                    """,
+                    (
+                        session.session_id,
+                        session.quiz_id,
+                        session.room_id,
+                        session.start_datetime,
+                        session.end_datetime,
+                        session.moderator_id,
+                    ),
                 )
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (session_id) DO UPDATE SET
-                    end_datetime = EXCLUDED.end_datetime
-                """,
-                (
-                    session.session_id,
-                    session.quiz_id,
-                    session.room_id,
-                    session.start_datetime,
-                    session.end_datetime,
-                    session.moderator_id,
-                ),
-            )
-            self.connection.commit()
-            return True
+                row = cursor.fetchone()
+            return DbSession.get_from_db(*row)
         except psycopg2.Error as e:
-            logger.error(f"Error adding session: {e}")
-            return False
+            logger.error("Error adding session: %s", e)
+            raise Errors.ServerError()
 
     def get_session(self, session_id: str) -> Optional[DbSession]:
         try:
-            self.cursor.execute(
-                """
-                SELECT session_id, quiz_id, room_id, start_datetime,
-                       end_datetime, moderator_id
-                FROM quiz_sessions
-                WHERE session_id = %s
-                """,
-                (session_id,),
-            )
-            row = self.cursor.fetchone()
-            return (
-                DbSession.get_from_db(
-                    session_id=row["session_id"],
-                    quiz_id=row["quiz_id"],
-                    room_id=row["room_id"],
-                    start_datetime=row["start_datetime"],
-                    end_datetime=row["end_datetime"],
-                    moderator_id=row["moderator_id"],
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "get_session",
+                    """
+                    SELECT quiz_id, room_id, session_id, moderator_id,
+                           start_datetime, end_datetime
+                    FROM quiz_sessions
+                    WHERE session_id = $1
+                    """,
+                    (session_id,),
                 )
-                if row
-                else None
-            )
+                row = cursor.fetchone()
+                return DbSession.get_from_db(*row) if row else None
         except psycopg2.Error as e:
-            logger.error(f"Error getting session: {e}")
+            logger.error("Error getting session: %s", e)
             return None
 
 
 class QuizDataRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quizzes (
-                quiz_id TEXT PRIMARY KEY,
-                quiz_name TEXT NOT NULL,
-                quiz_description TEXT
-            )
-            """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quizzes (
+            quiz_id TEXT PRIMARY KEY,
+            quiz_name TEXT NOT NULL,
+            quiz_description TEXT
         )
-        self.connection.commit()
+        """
 
     def add_quiz(self, quiz: DbQuiz) -> bool:
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO quizzes (quiz_id, quiz_name, quiz_description)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (quiz_id) DO UPDATE SET
-                    quiz_name = EXCLUDED.quiz_name,
-                    quiz_description = EXCLUDED.quiz_description
-                """,
-                (quiz.quiz_id, quiz.quiz_name, quiz.quiz_description),
-            )
-            self.connection.commit()
+            with self._cursor() as cursor:
+                self._execute_prepared(
+                    cursor,
+                    "add_quiz",
+                    """
+                    INSERT INTO quizzes (quiz_id, quiz_name, quiz_description)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (quiz_id) DO UPDATE SET
+                        quiz_name = EXCLUDED.quiz_name,
+                        quiz_description = EXCLUDED.quiz_description
+                    """,
+                    (quiz.quiz_id, quiz.quiz_name, quiz.quiz_description),
+                )
             return True
         except Exception as e:
-            logger.error(f"Error adding quiz: {e}")
-            return None
+            logger.error("Error adding quiz: %s", e)
+            raise Errors.ServerError()
 
 
 class QuizParticipantsAnswersRepository(BaseRepository):
-    def create_table(self):
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_participants_answers (
-                session_id TEXT,
-                user_id TEXT,
-                question_id TEXT,
-                answer_id TEXT,
-                points INTEGER,
-                is_correct BOOLEAN,
-                timestamp INTEGER,
-                quiz_id TEXT,
-                PRIMARY KEY (session_id, user_id, question_id),
-                FOREIGN KEY (session_id) REFERENCES quiz_sessions(session_id),
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (question_id, quiz_id) REFERENCES questions(question_id, quiz_id)  -- Fixed foreign key reference
-            )
-            """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quiz_participants_answers (
+            session_id TEXT,
+            user_id TEXT,
+            question_id TEXT,
+            answer_id TEXT,
+            points INTEGER,
+            is_correct BOOLEAN,
+            timestamp INTEGER,
+            quiz_id TEXT,
+            PRIMARY KEY (session_id, user_id, question_id),
+            FOREIGN KEY (session_id) REFERENCES quiz_sessions(session_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id),
+            FOREIGN KEY (question_id, quiz_id) REFERENCES questions(question_id, quiz_id)  -- Fixed foreign key reference
         )
-        self.connection.commit()
+        """
 
     def insert_users_answer(self, user_answer: UserAnswer) -> None:
+        """
+        Inserts a participant's answer.
+        """
+        self.insert_users_answers([user_answer])
+
+    def insert_users_answers(self, user_answers: List[UserAnswer]) -> None:
+        """
+        Inserts several participants' answers with a single statement and commit.
+        Runs on the answers writer thread, outside any request transaction, so it commits
+        on its own pooled connection.
+        The commit does not wait for the WAL flush: on a database crash the last few
+        answers may be lost, which is acceptable for a live quiz.
+        """
+        # One statement cannot upsert the same row twice, so only the latest answer
+        # of a participant to a question is kept
+        latest_answers = {
+            (
+                user_answer.session_id,
+                user_answer.user_id,
+                user_answer.question_id,
+            ): user_answer
+            for user_answer in user_answers
+        }
+        if len(latest_answers) >= COPY_MIN_ROWS:
+            self.copy_users_answers(list(latest_answers.values()))
+            return
         try:
-            self.cursor.execute(
-                """
-                INSERT INTO quiz_participants_answers (
-                    session_id,quiz_id, user_id, question_id, answer_id, points, is_correct, timestamp
+            with self._cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    SET LOCAL synchronous_commit = off;
+                    INSERT INTO quiz_participants_answers (
+                        session_id,quiz_id, user_id, question_id, answer_id, points, is_correct, timestamp
+                    )
+                    VALUES %s
+                    ON CONFLICT (session_id, user_id, question_id) DO UPDATE SET
+                        answer_id = EXCLUDED.answer_id,
+                        points = EXCLUDED.points,
+                        is_correct = EXCLUDED.is_correct,
+                        timestamp = EXCLUDED.timestamp
+                    """,
+                    [
+                        (
+                            user_answer.session_id,
+                            user_answer.quiz_id,
+                            user_answer.user_id,
+                            user_answer.question_id,
+                            user_answer.answer_id,
+                            user_answer.points,
+                            user_answer.is_correct,
+                            user_answer.timestamp,
+                        )
+                        for user_answer in latest_answers.values()
+                    ],
+                    page_size=INSERT_PAGE_SIZE,
+                )
+        except Exception as e:
+            logger.error("Error inserting user answers: %s", e)
+
+    def copy_users_answers(self, user_answers: List[UserAnswer]) -> None:
+        """
+        Inserts many answers, at most one per participant and question, by streaming them
+        with COPY. The commit does not wait for the WAL flush, as in insert_users_answers.
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                self._copy_upsert(
+                    cursor,
+                    "quiz_participants_answers",
+                    """
+                    session_id, quiz_id, user_id, question_id, answer_id, points,
+                    is_correct, timestamp
+                    """,
+                    [
+                        (
+                            user_answer.session_id,
+                            user_answer.quiz_id,
+                            user_answer.user_id,
+                            user_answer.question_id,
+                            user_answer.answer_id,
+                            user_answer.points,
+                            user_answer.is_correct,
+                            user_answer.timestamp,
+                        )
+                        for user_answer in user_answers
+                    ],
+                    """
+                    ON CONFLICT (session_id, user_id, question_id) DO UPDATE SET
+                        answer_id = EXCLUDED.answer_id,
+                        points = EXCLUDED.points,
+                        is_correct = EXCLUDED.is_correct,
+                        timestamp = EXCLUDED.timestamp
+                    """,
                 )
-                VALUES (%s, %s,%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (session_id, user_id, question_id) DO UPDATE SET
-                    answer_id = EXCLUDED.answer_id,
-                    points = EXCLUDED.points,
-                    is_correct = EXCLUDED.is_correct,
-                    timestamp = EXCLUDED.timestamp
-                """,
-                (
-                    user_answer.session_id,
-                    user_answer.quiz_id,
-                    user_answer.user_id,
-                    user_answer.question_id,
-                    user_answer.answer_id,
-                    user_answer.points,
-                    user_answer.is_correct,
-                    user_answer.timestamp,
-                ),
-            )
-            self.connection.commit()
         except Exception as e:
-            logger.error(f"Error inserting user answer: {e}")
+            logger.error("Error copying user answers: %s", e)
 
     def delete_all_rows(self):
         try:
-            self.cursor.execute(
-                """
-                DELETE FROM quiz_participants_answers
-                """
-            )
-            self.connection.commit()
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM quiz_participants_answers
+                    """
+                )
         except Exception as e:
-            logger.error(f"Error deleting all rows: {e}")
+            logger.error("Error deleting all rows: %s", e)
 
     def get_quiz_results(self, session_id, quiz_id):
         try:
-            self.cursor.execute(
-                """
-            SELECT qpa.user_id,
-            u.username,
-            SUM(CASE WHEN qpa.is_correct = true THEN qpa.points ELSE 0 END) as score
-            FROM quiz_participants_answers qpa
-            JOIN users u ON qpa.user_id = u.user_id
-            WHERE qpa.session_id = %s AND qpa.quiz_id = %s
-            GROUP BY qpa.user_id, u.username
-            ORDER BY score DESC
-                """,
-                (session_id, quiz_id),
-            )
-            rows = self.cursor.fetchall()
-            return [
-                UserResults(user_id=row[0], username=row[1], score=row[2])
-                for row in rows
-            ]
-        except Exception as e:
-            logger.error(f"Error getting quiz results: {e}")
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                SELECT qpa.user_id,
+                u.username,
+                SUM(CASE WHEN qpa.is_correct = true THEN qpa.points ELSE 0 END) as score
+                FROM quiz_participants_answers qpa
+                JOIN users u ON qpa.user_id = u.user_id
+                WHERE qpa.session_id = %s AND qpa.quiz_id = %s
+                GROUP BY qpa.user_id, u.username
+                ORDER BY score DESC
+                    """,
+                    (session_id, quiz_id),
+                )
+                rows = cursor.fetchall()
+                return [
+                    UserResults(user_id=row[0], username=row[1], score=row[2])
+                    for row in rows
+                ]
+        except psycopg2.Error as e:
+            logger.error("Error getting quiz results: %s", e)
             return None
 
 
 class DbManager:
     def __init__(self):
-        self.connection = psycopg2.connect(DB_URL)
-        self.quizzes = QuizDataRepository(self.connection)
-        self.users = UsersRepository(self.connection)
-        self.quiz_permissions = QuizPermissionsRepository(self.connection)
-        self.questions = QuestionsRepository(self.connection)
-        self.quiz_participents = QuizParticipentsRepository(self.connection)
-        self.quiz_sessions = QuizSessionsRepository(self.connection)
-        self.quiz_participants_answers = QuizParticipantsAnswersRepository(
-            self.connection
-        )
+        self.pool = get_connection_pool()
+        self.quizzes = QuizDataRepository(self.pool)
+        self.users = UsersRepository(self.pool)
+        self.quiz_permissions = QuizPermissionsRepository(self.pool)
+        self.questions = QuestionsRepository(self.pool)
+        self.quiz_participents = QuizParticipentsRepository(self.pool)
+        self.quiz_sessions = QuizSessionsRepository(self.pool)
+        self.quiz_participants_answers = QuizParticipantsAnswersRepository(self.pool)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the repository calls made inside the block on one pooled connection, and commits
+        them once, or rolls them all back on error. A nested block joins the outer transaction.
+        """
+        if _transaction_connection.get() is not None:
+            yield self
+            return
+
+        connection = self.pool.getconn()
+        token = _transaction_connection.set(connection)
+        try:
+            yield self
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            _transaction_connection.reset(token)
+            self.pool.putconn(connection)
 
     def create_tables(self):
-        self.users.create_table()
-        self.quizzes.create_table()
-        self.quiz_sessions.create_table()
-        self.quiz_permissions.create_table()
-        self.questions.create_table()
-        self.quiz_participents.create_table()
-        self.quiz_participants_answers.create_table()
+        """
+        Creates all tables in one round trip and one commit. Repositories are listed in
+        foreign key order, since each schema may reference the tables created before it.
+        """
+        repositories = (
+            self.users,
+            self.quizzes,
+            self.quiz_sessions,
+            self.quiz_permissions,
+            self.questions,
+            self.quiz_participents,
+            self.quiz_participants_answers,
+        )
+        ddl = ";\n".join(repository.SCHEMA.strip() for repository in repositories)
+        connection = self.pool.getconn()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(ddl)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self.pool.putconn(connection)
 
     def close(self):
-        self.users.close()
-        self.quiz_permissions.close()
-        self.questions.close()
-        self.quiz_participents.close()
-        self.quiz_sessions.close()
-        self.quizzes.close()
-        self.quiz_participants_answers.close()
+        if not self.pool.closed:
+            self.pool.closeall()
 
     def __enter__(self):
         return self
@@ -1,9 +1,11 @@
+from dataclasses import dataclass
 from enum import StrEnum
-import json
-from uuid import uuid4
-from pydantic import BaseModel, Field, field_validator, model_validator
+import orjson
+from os import urandom
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Dict, Optional, List
+from functools import cached_property
 
 
 class UserRole(StrEnum):
@@ -11,15 +13,26 @@ class UserRole(StrEnum):
     PARTICIPANT = "participant"
 
 
+_ROLE_BY_VALUE = {role.value: role for role in UserRole}
+
+
 class QuestionType(StrEnum):
     MULTIPLE_CHOICE = "multiple_choice"
 
     @classmethod
     def from_str(cls, question_type: str):
-        return cls(question_type)
+        return _QUESTION_TYPE_BY_VALUE[question_type]
+
+
+_QUESTION_TYPE_BY_VALUE = {
+    question_type.value: question_type for question_type in QuestionType
+}
 
 
 class DbUser(BaseModel):
+    # Cached per process by UsersRepository and shared, so instances are immutable
+    model_config = ConfigDict(frozen=True)
+
     user_id: str
     username: str
     email: str
@@ -29,13 +42,13 @@ class DbUser(BaseModel):
     def get_from_db(
         cls, user_id: str, username: str, email: str, create_date: datetime
     ):
-        return cls(
+        return cls.model_construct(
             user_id=user_id, username=username, email=email, create_date=create_date
         )
 
     @classmethod
     def generate_new_id(cls) -> str:
-        return str(uuid4())
+        return urandom(16).hex()
 
 
 class DbParticipent(BaseModel):
@@ -54,8 +67,9 @@ class UserPermission(BaseModel):
 
     @classmethod
     def get_from_db(cls, quiz_id: str, user_id: str, permission: str):
-        permission = UserRole(permission)
-        return cls(quiz_id=quiz_id, user_id=user_id, permission=permission)
+        return cls.model_construct(
+            quiz_id=quiz_id, user_id=user_id, permission=_ROLE_BY_VALUE[permission]
+        )
 
     @field_validator("permission")
     def validate_permission(cls, v):
@@ -80,22 +94,22 @@ class DbSession(BaseModel):
         start_datetime: datetime,
         end_datetime: Optional[datetime] = None,
     ):
-        return cls(
+        return cls.model_construct(
             quiz_id=quiz_id,
             room_id=room_id,
             session_id=session_id,
             moderator_id=moderator_id,
             start_datetime=start_datetime,
-            end_date=end_datetime,
+            end_datetime=end_datetime,
         )
 
     @classmethod
     def generate_room_id(cls) -> str:
-        return str(uuid4())
+        return urandom(16).hex()
 
     @classmethod
     def generate_session_id(cls) -> str:
-        return str(uuid4())
+        return urandom(16).hex()
 
 
 class AnswerOption(BaseModel):
@@ -103,6 +117,8 @@ class AnswerOption(BaseModel):
     Represents a single answer option for a question.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     answer: str = Field(..., description="The text of the answer option")
     correct_answer: bool = Field(
         default=False, description="Whether this option is the correct answer"
@@ -116,7 +132,7 @@ class AnswerOption(BaseModel):
         ..., description="The unique identifier for the quiz the question belongs to"
     )
 
-    def model_dump_json(self):
+    def to_dict(self):
         return {
             "answer": self.answer,
             "correct_answer": self.correct_answer,
@@ -127,18 +143,27 @@ class AnswerOption(BaseModel):
 
     @classmethod
     def generate_answer_id(cls) -> str:
-        return str(uuid4())
+        return urandom(16).hex()
 
 
 class AnswerOptions(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     answers: List[AnswerOption]
 
-    def model_dump_json(self):
-        return [answer.model_dump_json() for answer in self.answers]
+    def to_dict(self):
+        return [answer.to_dict() for answer in self.answers]
+
+    def to_json_bytes(self) -> bytes:
+        return orjson.dumps(self.to_dict())
+
+    @cached_property
+    def answers_by_id(self) -> Dict[str, AnswerOption]:
+        return {answer.answer_id: answer for answer in self.answers}
 
     @classmethod
     def from_str(cls, answers: str):
-        return cls(answers=json.loads(answers))
+        return cls(answers=orjson.loads(answers))
 
     @classmethod
     def from_json(cls, answers: dict):
@@ -146,13 +171,18 @@ class AnswerOptions(BaseModel):
 
     @model_validator(mode="after")
     def validate_answers_id(cls, v):
-        unique_ids = set([answer.answer_id for answer in v.answers])
-        if len(unique_ids) != len(v.answers):
-            raise ValueError("Answer IDs must be unique")
+        seen_ids = set()
+        for answer in v.answers:
+            if answer.answer_id in seen_ids:
+                raise ValueError("Answer IDs must be unique")
+            seen_ids.add(answer.answer_id)
         return v
 
 
 class DbQuestion(BaseModel):
+    # Cached per quiz and shared between sessions, so instances are immutable
+    model_config = ConfigDict(frozen=True)
+
     question_id: str
     question: str
     question_number: int
@@ -164,12 +194,22 @@ class DbQuestion(BaseModel):
 
     @model_validator(mode="after")
     def validate_answers(cls, v):
-        if v == QuestionType.MULTIPLE_CHOICE:
-            if len(cls.answers) < 2:
+        """
+        Runs on incoming questions only; stored questions are rebuilt with model_construct.
+        """
+        if v.question_type == QuestionType.MULTIPLE_CHOICE:
+            options = v.answers.answers
+            if len(options) < 2:
                 raise ValueError(
                     "Multiple choice questions must have at least 2 answer options"
                 )
-            if sum([1 for option in cls.answers if option.correct_answer]) != 1:
+            correct_answers = 0
+            for option in options:
+                if option.correct_answer:
+                    correct_answers += 1
+                    if correct_answers > 1:
+                        break
+            if correct_answers != 1:
                 raise ValueError(
                     "Multiple choice questions must have exactly 1 correct answer"
                 )
@@ -187,18 +227,18 @@ class DbQuestion(BaseModel):
             raise ValueError("Question number must be greater than 0")
         return v
 
-    def model_dump_json(self):
+    def to_dict(self):
         return {
             "question_id": self.question_id,
             "question": self.question,
             "question_number": self.question_number,
             "points": self.points,
-            "answers": self.answers.model_dump_json(),
+            "answers": self.answers.to_dict(),
             "question_type": self.question_type,
             "seconds_to_answer": self.seconds_to_answer,
         }
 
-    def client_model_dump_json(self):
+    def client_to_dict(self):
         return {
             "question_id": self.question_id,
             "question": self.question,
@@ -208,6 +248,31 @@ class DbQuestion(BaseModel):
             "seconds_to_answer": self.seconds_to_answer,
         }
 
+    @cached_property
+    def client_dict(self) -> dict:
+        """
+        The client_to_dict output, built once per question.
+        Shared between payloads and must be treated as read-only.
+        """
+        return self.client_to_dict()
+
+    @cached_property
+    def participant_options(self) -> List[dict]:
+        """
+        The answer options menu shown to participants while this question is active.
+        Shared between payloads and must be treated as read-only.
+        """
+        return [
+            {
+                "option": a.answer,
+                "option_type": "answer",
+                "answer-id": a.answer_id,
+                "quiz-id": a.quiz_id,
+                "question-id": a.question_id,
+            }
+            for a in self.answers.answers
+        ]
+
     @classmethod
     def get_from_db(
         cls,
@@ -215,17 +280,22 @@ class DbQuestion(BaseModel):
         question: str,
         question_number: int,
         points: int,
-        answers: str,
+        answers: List[dict],
         question_type: str,
         seconds_to_answer: int,
         quiz_id: str,
     ):
-        return cls(
+        """
+        Stored questions were validated before they were written, so they are rebuilt without validation.
+        """
+        return cls.model_construct(
             question_id=question_id,
             question=question,
             question_number=question_number,
             points=points,
-            answers=AnswerOptions.from_json(answers),
+            answers=AnswerOptions.model_construct(
+                answers=[AnswerOption.model_construct(**answer) for answer in answers]
+            ),
             question_type=QuestionType.from_str(question_type),
             seconds_to_answer=seconds_to_answer,
             quiz_id=quiz_id,
@@ -233,19 +303,27 @@ class DbQuestion(BaseModel):
 
     @classmethod
     def get_from_cache(cls, question_dict: dict):
-        return cls(
+        """
+        Cached questions were validated before they were written, so they are rebuilt without validation.
+        """
+        return cls.model_construct(
             question_id=question_dict.get("question_id"),
             question=question_dict.get("question"),
             question_number=question_dict.get("question_number"),
             points=question_dict.get("points"),
-            answers=AnswerOptions(answers=question_dict.get("answers")),
-            question_type=QuestionType(question_dict.get("question_type")),
+            answers=AnswerOptions.model_construct(
+                answers=[
+                    AnswerOption.model_construct(**answer)
+                    for answer in question_dict.get("answers")
+                ]
+            ),
+            question_type=QuestionType.from_str(question_dict.get("question_type")),
             seconds_to_answer=question_dict.get("seconds_to_answer"),
         )
 
     @classmethod
     def generate_question_id(self) -> str:
-        return str(uuid4())
+        return urandom(16).hex()
 
 
 class DbQuiz(BaseModel):
@@ -253,7 +331,7 @@ class DbQuiz(BaseModel):
     quiz_name: str
     quiz_description: str
 
-    def model_dump_json(self):
+    def to_dict(self):
         return {
             "quiz_id": self.quiz_id,
             "quiz_name": self.quiz_name,
@@ -262,7 +340,7 @@ class DbQuiz(BaseModel):
 
     @classmethod
     def get_from_db(cls, quiz_id: str, quiz_name: str, quiz_description: str):
-        return cls(
+        return cls.model_construct(
             quiz_id=quiz_id,
             quiz_name=quiz_name,
             quiz_description=quiz_description,
@@ -270,7 +348,7 @@ class DbQuiz(BaseModel):
 
     @classmethod
     def get_from_cache(cls, quiz_dict: dict):
-        return cls(
+        return cls.model_construct(
             quiz_id=quiz_dict.get("quiz_id"),
             quiz_name=quiz_dict.get("quiz_name"),
             quiz_description=quiz_dict.get("quiz_description"),
@@ -278,10 +356,15 @@ class DbQuiz(BaseModel):
 
     @classmethod
     def generate_quiz_id(self):
-        return str(uuid4())
+        return urandom(16).hex()
 
 
-class UserAnswer(BaseModel):
+@dataclass(slots=True, frozen=True)
+class UserAnswer:
+    """
+    A participant's answer. Built server-side from checked values, so it is not validated.
+    """
+
     user_id: str
     question_id: str
     answer_id: str
@@ -290,7 +373,6 @@ class UserAnswer(BaseModel):
     quiz_id: str
     points: int
     is_correct: bool
-    quiz_id: str
 
 
 class UserResults(BaseModel):
@@ -298,7 +380,7 @@ class UserResults(BaseModel):
     score: int
     username: str
 
-    def model_dump_json(self):
+    def to_dict(self):
         return {
             "user_id": self.user_id,
             "score": self.score,
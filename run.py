@@ -6,9 +6,16 @@ if __name__ == "__main__":
 
     SERVER_HOST = os.getenv("SERVER_HOST")
     SERVER_PORT = os.getenv("SERVER_PORT")
+    WS_PER_MESSAGE_DEFLATE = os.getenv("WS_PER_MESSAGE_DEFLATE", "true") == "true"
+    RELOAD = os.getenv("RELOAD", "false") == "true"
+    # Answers are buffered per process, so results only see other workers' answers once
+    # their writers have flushed; keep a single worker unless that delay is acceptable
+    WORKERS = 1 if RELOAD else int(os.getenv("WORKERS", "1"))
     uvicorn.run(
         "app.api.main:app",
         host=SERVER_HOST,
         port=int(SERVER_PORT),
-        reload=True,
+        reload=RELOAD,
+        workers=WORKERS,
+        ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE,
     )